@@ -36,6 +36,6 @@ async def main():
             result_url = await client.get_result_url(task_id, name="output_video")
             print("video url:", result_url)
     finally:
-        client.close()
+        await client.close()
 
 asyncio.run(main())
\ No newline at end of file
@@ -8,7 +8,6 @@ LightX2V 音色克隆客户端工具
 
 import os
 import json
-import requests
 import argparse
 import sys
 import base64
@@ -18,6 +17,12 @@ from loguru import logger
 import asyncio
 import aiohttp
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class LightX2VVoiceCloneClient:
     """
@@ -36,28 +41,37 @@ class LightX2VVoiceCloneClient:
         """
         self.base_url = base_url or os.getenv("LIGHTX2V_BASE_URL", "http://localhost:8080")
         self.access_token = access_token or os.getenv("LIGHTX2V_ACCESS_TOKEN", "")
-        self.session = requests.Session()
-        
-        # 设置默认请求头
-        self.session.headers.update({
-            "Accept": "application/json"
-        })
-        if self.access_token:
-            self.session.headers.update({
-                "Authorization": f"Bearer {self.access_token}"
-            })
-        
+
+        # 预先构建认证请求头，避免每次调用重新拼接
+        self._auth_header = {"Authorization": f"Bearer {self.access_token}"} if self.access_token else {}
+        self._headers = {"Accept": "application/json", **self._auth_header}
+        # 共享的 aiohttp 会话，首次请求时惰性创建（复用连接池）
+        self._session: Optional[aiohttp.ClientSession] = None
+
         logger.info(f"LightX2VVoiceCloneClient initialized with base_url: {self.base_url}")
-    
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享的 aiohttp 会话（惰性创建）"""
+        if self._session is None or self._session.closed:
+            # 针对单主机批量 TTS：加大连接池并延长 keep-alive，
+            # 批量请求复用既有 TCP+TLS 连接，避免反复握手
+            connector = aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=16,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(headers=self._headers, connector=connector)
+        return self._session
+
     async def check_response(self, response, prefix):
         """检查响应状态"""
-        logger.info(f"{prefix}: status_code: {response.status_code}")
-        if response.status_code not in [200, 201]:
+        logger.info(f"{prefix}: status_code: {response.status}")
+        if response.status not in [200, 201]:
             try:
-                error_data = response.json()
-                logger.warning(f"{prefix}: HTTP error response: {response.status_code}, {error_data}")
+                error_data = await response.json(content_type=None)
+                logger.warning(f"{prefix}: HTTP error response: {response.status}, {error_data}")
             except:
-                logger.warning(f"{prefix}: HTTP error response: {response.status_code}, {response.text}")
+                logger.warning(f"{prefix}: HTTP error response: {response.status}, {await response.text()}")
             return False
         return True
     
@@ -71,9 +85,6 @@ class LightX2VVoiceCloneClient:
         Returns:
             base64 编码的字符串
         """
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
-        
         with open(audio_path, "rb") as f:
             audio_data = base64.b64encode(f.read()).decode('utf-8')
         
@@ -101,24 +112,21 @@ class LightX2VVoiceCloneClient:
         logger.info(f"Cloning voice from: {audio_path}, text={text if text else 'auto ASR'}")
         
         try:
-            # 准备文件数据
-            headers = {}
-            if self.access_token:
-                headers["Authorization"] = f"Bearer {self.access_token}"
-            
-            data = {}
+            session = await self._get_session()
+
+            form = aiohttp.FormData()
             if text:
-                data["text"] = text
-            
+                form.add_field("text", text)
+
+            fname = os.path.basename(audio_path)
             with open(audio_path, "rb") as f:
-                files = {"file": (os.path.basename(audio_path), f, "audio/*")}
-                response = requests.post(url, files=files, data=data, headers=headers)
-            
-            if not await self.check_response(response, "LightX2VVoiceCloneClient clone_voice"):
-                return {"success": False, "error": f"HTTP {response.status_code}"}
-            
-            result = response.json()
-            
+                form.add_field("file", f, filename=fname, content_type="audio/*")
+                async with session.post(url, data=form) as response:
+                    if not await self.check_response(response, "LightX2VVoiceCloneClient clone_voice"):
+                        return {"success": False, "error": f"HTTP {response.status}"}
+
+                    result = await response.json(content_type=None)
+
             if "speaker_id" in result:
                 # 成功
                 ret = {
@@ -130,9 +138,16 @@ class LightX2VVoiceCloneClient:
                 
                 # 如果指定了保存路径，保存文本信息
                 if save_path:
-                    os.makedirs(os.path.dirname(save_path) if os.path.dirname(save_path) else '.', exist_ok=True)
-                    with open(save_path, "w", encoding="utf-8") as f:
-                        json.dump(ret, f, indent=2, ensure_ascii=False)
+                    save_dir = os.path.dirname(save_path)
+                    if save_dir and not os.path.isdir(save_dir):
+                        os.makedirs(save_dir, exist_ok=True)
+                    if ORJSON_AVAILABLE:
+                        # orjson 一次性产出 UTF-8 字节，比 stdlib json 编码快得多
+                        with open(save_path, "wb") as f:
+                            f.write(orjson.dumps(ret, option=orjson.OPT_INDENT_2))
+                    else:
+                        with open(save_path, "w", encoding="utf-8") as f:
+                            json.dump(ret, f, indent=2, ensure_ascii=False)
                     logger.info(f"Clone info saved to: {save_path}")
                 
                 logger.info(f"Voice clone successful: speaker_id={ret['speaker_id']}")
@@ -145,6 +160,35 @@ class LightX2VVoiceCloneClient:
             logger.error(f"LightX2VVoiceCloneClient clone_voice failed: {e}")
             return {"success": False, "error": str(e)}
     
+    async def ensure_speaker(
+        self,
+        *,
+        speaker_id: Optional[str] = None,
+        audio_path: Optional[str] = None,
+        text: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        解析可用的 speaker_id：已知时直接返回，否则走 clone_voice
+
+        已经拿到 speaker_id 的调用方（例如上一次克隆的返回值）无需再次
+        上传参考音频，直接复用即可；只有未提供 speaker_id 时才执行克隆。
+
+        Args:
+            speaker_id: 已有的音色 ID（可选，提供时跳过克隆）
+            audio_path: 音频文件路径（speaker_id 未提供时必需）
+            text: 音频对应的文本（可选）
+
+        Returns:
+            包含 success, speaker_id 的字典
+        """
+        if speaker_id:
+            return {"success": True, "speaker_id": speaker_id}
+
+        if not audio_path:
+            return {"success": False, "error": "Either speaker_id or audio_path is required"}
+
+        return await self.clone_voice(audio_path=audio_path, text=text)
+
     async def tts_with_clone(
         self,
         text: str,
@@ -188,41 +232,48 @@ class LightX2VVoiceCloneClient:
         logger.info(f"Generating TTS with cloned voice: text={text[:50]}..., speaker_id={speaker_id}")
         
         try:
-            response = self.session.post(url, json=payload)
-            
-            if not await self.check_response(response, "LightX2VVoiceCloneClient tts_with_clone"):
-                return {"success": False, "error": f"HTTP {response.status_code}"}
-            
-            # 检查响应内容类型
-            content_type = response.headers.get("Content-Type", "")
-            if "audio" in content_type or "application/octet-stream" in content_type:
-                # 返回的是音频文件
-                audio_data = response.content
-                
-                result = {
-                    "success": True,
-                    "audio_data": audio_data,
-                    "content_type": content_type,
-                    "size": len(audio_data)
-                }
-                
-                # 如果指定了保存路径，保存文件
-                if save_path:
-                    os.makedirs(os.path.dirname(save_path) if os.path.dirname(save_path) else '.', exist_ok=True)
-                    with open(save_path, "wb") as f:
-                        f.write(audio_data)
-                    result["audio_path"] = save_path
-                    logger.info(f"Audio saved to: {save_path}")
-                
-                return result
-            else:
-                # 返回的是 JSON 错误信息
-                try:
-                    error_data = response.json()
-                    return {"success": False, "error": error_data.get("error", "Unknown error")}
-                except:
-                    return {"success": False, "error": response.text}
-            
+            session = await self._get_session()
+            async with session.post(url, json=payload) as response:
+                if not await self.check_response(response, "LightX2VVoiceCloneClient tts_with_clone"):
+                    return {"success": False, "error": f"HTTP {response.status}"}
+
+                # 检查响应内容类型
+                content_type = response.headers.get("Content-Type", "")
+                if "audio" in content_type or "application/octet-stream" in content_type:
+                    if save_path:
+                        # 直接分块落盘，不在内存里整体拼出音频数据
+                        save_dir = os.path.dirname(save_path)
+                        if save_dir and not os.path.isdir(save_dir):
+                            os.makedirs(save_dir, exist_ok=True)
+                        size = 0
+                        with open(save_path, "wb") as f:
+                            async for chunk in response.content.iter_chunked(64 * 1024):
+                                f.write(chunk)
+                                size += len(chunk)
+                        logger.info(f"Audio saved to: {save_path}")
+                        return {
+                            "success": True,
+                            "audio_path": save_path,
+                            "content_type": content_type,
+                            "size": size
+                        }
+
+                    # 未指定保存路径时返回完整音频数据
+                    audio_data = await response.read()
+                    return {
+                        "success": True,
+                        "audio_data": audio_data,
+                        "content_type": content_type,
+                        "size": len(audio_data)
+                    }
+                else:
+                    # 返回的是 JSON 错误信息
+                    try:
+                        error_data = await response.json(content_type=None)
+                        return {"success": False, "error": error_data.get("error", "Unknown error")}
+                    except:
+                        return {"success": False, "error": await response.text()}
+
         except Exception as e:
             logger.error(f"LightX2VVoiceCloneClient tts_with_clone failed: {e}")
             return {"success": False, "error": str(e)}
@@ -252,23 +303,16 @@ class LightX2VVoiceCloneClient:
         logger.info(f"Saving voice clone: speaker_id={speaker_id}, name={name}")
         
         try:
-            response = self.session.post(url, json=payload)
-            
-            if not await self.check_response(response, "LightX2VVoiceCloneClient save_voice_clone"):
-                return {"success": False, "error": f"HTTP {response.status_code}"}
-            
-            result = response.json()
-            
-            if "message" in result and "success" in result.get("message", "").lower():
-                return {
-                    "success": True,
-                    "message": result["message"],
-                    "speaker_id": result.get("speaker_id", speaker_id),
-                    "name": result.get("name", name)
-                }
-            else:
-                return {"success": False, "error": result.get("error", "Unknown error")}
-            
+            session = await self._get_session()
+            async with session.post(url, json=payload) as response:
+                if not await self.check_response(response, "LightX2VVoiceCloneClient save_voice_clone"):
+                    return {"success": False, "error": f"HTTP {response.status}"}
+
+                result = await response.json(content_type=None)
+
+            # check_response 已确认 HTTP 状态码，无需再扫描 message 文本
+            return {"success": True, "speaker_id": speaker_id, "name": name, **result}
+
         except Exception as e:
             logger.error(f"LightX2VVoiceCloneClient save_voice_clone failed: {e}")
             return {"success": False, "error": str(e)}
@@ -285,13 +329,13 @@ class LightX2VVoiceCloneClient:
         logger.info("Listing voice clones")
         
         try:
-            response = self.session.get(url)
-            
-            if not await self.check_response(response, "LightX2VVoiceCloneClient list_voice_clones"):
-                return {"success": False, "error": f"HTTP {response.status_code}"}
-            
-            result = response.json()
-            
+            session = await self._get_session()
+            async with session.get(url) as response:
+                if not await self.check_response(response, "LightX2VVoiceCloneClient list_voice_clones"):
+                    return {"success": False, "error": f"HTTP {response.status}"}
+
+                result = await response.json(content_type=None)
+
             if "voice_clones" in result:
                 return {
                     "success": True,
@@ -322,32 +366,28 @@ class LightX2VVoiceCloneClient:
         logger.info(f"Deleting voice clone: speaker_id={speaker_id}")
         
         try:
-            response = self.session.delete(url)
-            
-            if not await self.check_response(response, "LightX2VVoiceCloneClient delete_voice_clone"):
-                return {"success": False, "error": f"HTTP {response.status_code}"}
-            
-            result = response.json()
-            
-            if "message" in result and "success" in result.get("message", "").lower():
-                return {
-                    "success": True,
-                    "message": result["message"]
-                }
-            else:
-                return {"success": False, "error": result.get("error", "Unknown error")}
-            
+            session = await self._get_session()
+            async with session.delete(url) as response:
+                if not await self.check_response(response, "LightX2VVoiceCloneClient delete_voice_clone"):
+                    return {"success": False, "error": f"HTTP {response.status}"}
+
+                result = await response.json(content_type=None)
+
+            # check_response 已确认 HTTP 状态码，无需再扫描 message 文本
+            return {"success": True, **result}
+
         except Exception as e:
             logger.error(f"LightX2VVoiceCloneClient delete_voice_clone failed: {e}")
             return {"success": False, "error": str(e)}
     
-    def close(self):
+    async def close(self):
         """关闭会话"""
-        self.session.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
 
 
-async def test(args):
-    """测试函数"""
+def _build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器（模块级只构建一次，供 test() 复用）"""
     parser = argparse.ArgumentParser(description="LightX2V Voice Clone Client Test")
     parser.add_argument("--base_url", type=str, default=None, help="Service base URL")
     parser.add_argument("--token", type=str, default=None, help="Access token")
@@ -373,9 +413,17 @@ async def test(args):
     
     # 输出参数
     parser.add_argument("--output", type=str, default=None, help="Output file path")
-    
-    parsed_args = parser.parse_args(args) if args else parser.parse_args()
-    
+
+    return parser
+
+
+_PARSER = _build_parser()
+
+
+async def test(args):
+    """测试函数"""
+    parsed_args = _PARSER.parse_args(args) if args else _PARSER.parse_args()
+
     client = LightX2VVoiceCloneClient(
         base_url=parsed_args.base_url,
         access_token=parsed_args.token
@@ -463,9 +511,9 @@ async def test(args):
                 print(f"Voice clone deleted successfully!")
             else:
                 print(f"Delete failed: {result.get('error')}")
-    
+
     finally:
-        client.close()
+        await client.close()
 
 
 if __name__ == "__main__":
@@ -1,16 +1,147 @@
 # -*- coding: utf-8 -*-
 
-import requests
+import gzip
 import json
-import base64
+import mmap
 import os
+import atexit
 import argparse
+import functools
 import sys
+import aiohttp
+from multidict import CIMultiDict
 from loguru import logger
 import asyncio
+import random
 import time
 from typing import Optional, Dict, Any, List, Union, Tuple
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    # Fragment 是 orjson 3.7+ 才有的 API，旧版本退回普通字符串序列化
+    ORJSON_FRAGMENT_AVAILABLE = hasattr(orjson, "Fragment")
+except ImportError:
+    ORJSON_AVAILABLE = False
+    ORJSON_FRAGMENT_AVAILABLE = False
+
+try:
+    # pybase64 封装 libbase64，按 CPU 能力走 SIMD 编码，多 MB 文件快数倍
+    from pybase64 import b64encode as _b64encode
+except ImportError:
+    from base64 import b64encode as _b64encode
+
+# 提交体 gzip 压缩（base64 文本可压缩 ~30-40%），需服务端支持
+# Content-Encoding: gzip，默认关闭，通过环境变量开启
+GZIP_SUBMIT = os.getenv("LIGHTX2V_GZIP_SUBMIT", "0") == "1"
+# 小于该阈值的提交体不值得压缩（纯 JSON 元数据，压缩收益抵不过 CPU）
+_GZIP_MIN_SIZE = 64 * 1024
+
+# 轮询退避上限：状态长期不变的长任务最多退避到该间隔（秒）
+_MAX_POLL_INTERVAL = 30
+
+# 编码窗口大小：默认 3 MiB，窗口太小 Python 循环开销占主导，太大浪费
+# 缓存局部性。必须是 3 的倍数（分块 base64 不产生中间 padding），
+# 可通过环境变量调优而无需改代码
+_ENCODE_CHUNK = max(3, int(os.getenv("LIGHTX2V_ENCODE_CHUNK", 3 * 1024 * 1024)) // 3 * 3)
+
+
+@functools.lru_cache(maxsize=32)
+def _b64encode_file_cached(path: str, mtime_ns: int, size: int) -> bytes:
+    """
+    读取文件并 base64 编码，按 (path, mtime_ns, size) 缓存
+
+    同一素材重复提交时跳过文件 I/O 和整个编码过程；文件被修改后
+    mtime/size 变化会自然使旧条目失效。内存上限约为
+    maxsize × 最大文件的 base64 体积。
+    """
+    # mmap 让编码器直接走内核页缓存，省去 read() 到用户态的整份拷贝
+    chunk_size = _ENCODE_CHUNK
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        file_size = os.fstat(fd).st_size
+        if file_size == 0:
+            return b""
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            # 顺序访问提示让内核按序预读：下一窗口的磁盘读取与当前
+            # 窗口的 base64 计算重叠，隐藏大部分读延迟（平台支持时）
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mm)
+            try:
+                # base64 输出长度是精确可知的，一次性预分配，
+                # 避免 bytearray 增长时的几何级 realloc + memcpy
+                buf = bytearray(((file_size + 2) // 3) * 4)
+                pos = 0
+                for offset in range(0, file_size, chunk_size):
+                    encoded = _b64encode(view[offset:offset + chunk_size])
+                    buf[pos:pos + len(encoded)] = encoded
+                    pos += len(encoded)
+            finally:
+                view.release()
+        return bytes(buf)
+    finally:
+        os.close(fd)
+
+
+def _b64encode_file(path: str) -> bytes:
+    """对文件做带缓存的 base64 编码（以 stat 结果作为缓存键），返回 ASCII 字节"""
+    # 规范化为绝对路径，同一文件的相对/绝对写法共享一个缓存条目
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    return _b64encode_file_cached(path, st.st_mtime_ns, st.st_size)
+
+
+def _b64_json_value(path: str):
+    """
+    文件 base64 在 JSON 中的取值
+
+    base64 字符本身就是 JSON 安全的：orjson 可用时直接以 Fragment
+    形式拼入输出字节流，省去 decode('ascii') 和序列化时对整个
+    兆级字符串的再次转义/编码两趟遍历；否则退回普通 str。
+    """
+    raw = _b64encode_file(path)
+    if ORJSON_FRAGMENT_AVAILABLE:
+        return orjson.Fragment(b'"' + raw + b'"')
+    return raw.decode('ascii')
+
+
+# 各任务类型的参数规则：prompt 是否必填、必需的媒体输入（及错误信息）、
+# prompt 缺省值。submit_task 查表校验，代替逐类型 if/elif 链
+_TASK_REQUIREMENTS: Dict[str, Dict[str, Any]] = {
+    "s2v": {"prompt_required": True, "media": ()},
+    "i2v": {"prompt_required": True, "media": ()},
+    "t2v": {"prompt_required": True, "media": ()},
+    "i2i": {"prompt_required": True, "media": ()},
+    "t2i": {"prompt_required": True, "media": ()},
+    "flf2v": {
+        "prompt_required": False,
+        "media": (
+            ("input_image", "flf2v task requires input_image (first frame)"),
+            ("last_frame", "flf2v task requires last_frame (last frame)"),
+        ),
+    },
+    "animate": {
+        "prompt_required": False,
+        "default_prompt": "视频中的人在做动作",
+        "media": (
+            ("input_image", "animate task requires input_image"),
+            ("input_video", "animate task requires input_video"),
+        ),
+    },
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _base_params(task: str, model_cls: str, stage: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    按 (task, model_cls, stage) 缓存请求参数模板
+
+    批量提交循环中同一组合会反复出现，模板化后每次提交只做一次
+    dict() 展开，减少小对象分配。
+    """
+    return (("task", task), ("model_cls", model_cls), ("stage", stage))
+
 
 class LightX2VClient:
     """
@@ -26,6 +157,27 @@ class LightX2VClient:
     - animate: 图片 + 视频
     """
     
+    # shared() 进程级缓存：key 为 (base_url, access_token)
+    _shared_cache: Dict[Tuple[str, str], "LightX2VClient"] = {}
+
+    @classmethod
+    def shared(cls, base_url: str = None, access_token: str = None) -> "LightX2VClient":
+        """
+        获取进程级共享的客户端实例
+
+        按 (base_url, access_token) 缓存，避免短生命周期调用方
+        （如每个任务各建一个客户端）反复支付 TCP+TLS 握手开销。
+        进程退出时通过 atexit 统一关闭。
+        """
+        key = (
+            base_url or os.getenv("LIGHTX2V_BASE_URL", "http://localhost:8080"),
+            access_token or os.getenv("LIGHTX2V_ACCESS_TOKEN", ""),
+        )
+        client = cls._shared_cache.get(key)
+        if client is None:
+            client = cls._shared_cache.setdefault(key, cls(key[0], key[1]))
+        return client
+
     def __init__(self, base_url: str = None, access_token: str = None):
         """
         初始化客户端
@@ -36,117 +188,140 @@ class LightX2VClient:
         """
         self.base_url = base_url or os.getenv("LIGHTX2V_BASE_URL", "http://localhost:8080")
         self.access_token = access_token or os.getenv("LIGHTX2V_ACCESS_TOKEN", "")
-        self.session = requests.Session()
 
-        self.session.headers.update({
-            "Content-Type": "application/json; charset=utf-8",
-            "Accept": "application/json"
-        })
+        # Content-Type 不放进会话默认头：JSON 提交用预构建的 _json_headers，
+        # multipart 提交由 FormData 自带 boundary 的 Content-Type。
+        # 头一律在 __init__ 预构建为 CIMultiDict，免去 aiohttp 每次
+        # 请求时的 dict -> CIMultiDict 转换（轮询循环中每轮都会发生）
+        self._headers = {"Accept": "application/json"}
         if self.access_token:
-            self.session.headers.update({
-                "Authorization": f"Bearer {self.access_token}"
-            })
+            self._headers["Authorization"] = f"Bearer {self.access_token}"
+        self._json_headers = CIMultiDict({"Content-Type": "application/json; charset=utf-8"})
+        self._json_gzip_headers = CIMultiDict({**self._json_headers, "Content-Encoding": "gzip"})
+
+        # 共享的 aiohttp 会话，首次请求时惰性创建（复用连接池）
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # 服务端是否支持批量查询接口，首次调用 query_tasks 时探测
+        self._batch_query_supported: Optional[bool] = None
+
+        # cancel_task_nowait 的在途后台任务引用
+        self._bg_cancels: set = set()
+
+        # query_task 的 ETag 缓存：task_id -> (etag, 上次解析结果)
+        # 服务端不发 ETag 时此缓存保持为空，行为与之前一致
+        self._query_etags: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+
+        # 提交时记录 task_id -> 任务类型，get_result_url 免查询
+        self._task_types: Dict[str, str] = {}
+
+        # 轮询聚合：同一聚合窗口内各 wait_for_task 的查询合并成一批
+        self._poll_waiters: Dict[str, List[asyncio.Future]] = {}
+        self._poll_flush_task: Optional[asyncio.Task] = None
+
+        logger.debug(f"Initialized LightX2VClient base_url={self.base_url}")
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享的 aiohttp 会话（惰性创建）"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self._headers,
+                # keepalive_timeout 放宽到 60s，轮询间隔内连接不被回收，
+                # 避免每次 query_task 重付 TCP+TLS 握手
+                connector=aiohttp.TCPConnector(limit=64, keepalive_timeout=60),
+            )
+        return self._session
+
+    @staticmethod
+    async def _read_json(response) -> Any:
+        """
+        读取并解析响应 JSON，解析结果缓存在响应对象上
+
+        错误路径和成功路径可能都要看响应体；aiohttp 缓存的是原始字节，
+        重复 json() 仍会重新解析。这里用 orjson（可用时）解析一次并复用。
+        """
+        parsed = getattr(response, "_x2v_parsed", None)
+        if parsed is None:
+            body = await response.read()
+            if not body:
+                parsed = {}
+            elif ORJSON_AVAILABLE:
+                parsed = orjson.loads(body)
+            else:
+                parsed = json.loads(body)
+            response._x2v_parsed = parsed
+        return parsed
 
-        print(self.session.headers)
-    
     async def check_response(self, response, prefix):
         """检查响应状态"""
-        logger.info(f"{prefix}: status_code: {response.status_code}")
-        if response.status_code not in [200, 201]:
+        logger.info(f"{prefix}: status_code: {response.status}")
+        if response.status not in [200, 201]:
             try:
-                error_data = response.json()
-                logger.warning(f"{prefix}: HTTP error response: {response.status_code}, {error_data}")
+                error_data = await self._read_json(response)
+                logger.warning(f"{prefix}: HTTP error response: {response.status}, {error_data}")
             except:
-                logger.warning(f"{prefix}: HTTP error response: {response.status_code}, {response.text}")
+                logger.warning(f"{prefix}: HTTP error response: {response.status}, {await response.text()}")
             return False
         return True
     
-    def _encode_image(self, image_path: str) -> Dict[str, str]:
+    def _encode_file(self, path: str, kind: str = "File") -> Dict[str, str]:
         """
-        将图片文件编码为 base64
-        
+        将媒体文件编码为 base64
+
+        图片/音频/视频的编码流程完全一致，集中在这一处，mmap、SIMD
+        编码、缓存等优化只需维护一份。
+
         Args:
-            image_path: 图片文件路径
-            
+            path: 文件路径
+            kind: 文件类别（用于错误信息）
+
         Returns:
             包含 type 和 data 的字典
         """
-        if not os.path.exists(image_path):
+        # 不做 exists 预检：编码路径里的 os.stat/os.open 本身就会发现
+        # 文件缺失，省一次系统调用也避免 exists 与 open 之间的竞态
+        try:
+            return {
+                "type": "base64",
+                "data": _b64_json_value(path)
+            }
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{kind} file not found: {path}")
+
+    _encode_image = functools.partialmethod(_encode_file, kind="Image")
+    _encode_audio = functools.partialmethod(_encode_file, kind="Audio")
+    _encode_video = functools.partialmethod(_encode_file, kind="Video")
+
+
+    @staticmethod
+    def _encode_one_image(image_path: str):
+        """单张图片的编码（线程池内执行），带统一的错误信息"""
+        try:
+            return _b64_json_value(image_path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Image file not found: {image_path}")
-        
-        with open(image_path, "rb") as f:
-            image_data = base64.b64encode(f.read()).decode('utf-8')
-        
-        return {
-            "type": "base64",
-            "data": image_data
-        }
-    
-    def _encode_audio(self, audio_path: str) -> Dict[str, str]:
-        """
-        将音频文件编码为 base64
-        
-        Args:
-            audio_path: 音频文件路径
-            
-        Returns:
-            包含 type 和 data 的字典
-        """
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
-        
-        with open(audio_path, "rb") as f:
-            audio_data = base64.b64encode(f.read()).decode('utf-8')
-        
-        return {
-            "type": "base64",
-            "data": audio_data
-        }
-    
-    def _encode_video(self, video_path: str) -> Dict[str, str]:
-        """
-        将视频文件编码为 base64
-        
-        Args:
-            video_path: 视频文件路径
-            
-        Returns:
-            包含 type 和 data 的字典
-        """
-        if not os.path.exists(video_path):
-            raise FileNotFoundError(f"Video file not found: {video_path}")
-        
-        with open(video_path, "rb") as f:
-            video_data = base64.b64encode(f.read()).decode('utf-8')
-        
-        return {
-            "type": "base64",
-            "data": video_data
-        }
-    
-    def _encode_images(self, image_paths: List[str]) -> Dict[str, Any]:
+
+    async def _encode_images(self, image_paths: List[str]) -> Dict[str, Any]:
         """
         将多张图片编码为目录格式（用于 i2i 任务）
-        
+
+        各文件相互独立，丢进线程池并发编码：文件 I/O 与释放 GIL 的
+        base64 内核可以重叠，多图场景不再串行阻塞事件循环。
+
         Args:
             image_paths: 图片文件路径列表
-            
+
         Returns:
             包含 type 和 data 的字典（目录格式）
         """
         if not image_paths:
             raise ValueError("Image paths list is empty")
-        
-        data = {}
-        for image_path in image_paths:
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image file not found: {image_path}")
-            
-            filename = os.path.basename(image_path)
-            with open(image_path, "rb") as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
-            data[filename] = image_data
-        
+
+        encoded = await asyncio.gather(
+            *(asyncio.to_thread(self._encode_one_image, p) for p in image_paths)
+        )
+        data = {os.path.basename(p): v for p, v in zip(image_paths, encoded)}
+
         return {
             "type": "directory",
             "data": data
@@ -218,45 +393,31 @@ class LightX2VClient:
             - 对于 t2v 任务，custom_shape 需要在合理范围内（256-1280）
         """
         # 验证任务类型
-        valid_tasks = ["s2v", "i2v", "t2v", "i2i", "t2i", "flf2v", "animate"]
-        if task not in valid_tasks:
-            raise ValueError(f"Invalid task type: {task}. Valid types: {valid_tasks}")
-        
-        # 构建请求参数
-        params = {
-            "task": task,
-            "model_cls": model_cls,
-            "stage": stage
+        requirements = _TASK_REQUIREMENTS.get(task)
+        if requirements is None:
+            raise ValueError(f"Invalid task type: {task}. Valid types: {list(_TASK_REQUIREMENTS)}")
+
+        # 一次性构建请求参数：kwargs 在前，显式字段覆盖同名键，
+        # 避免先建 3 键字典再 update(kwargs) 的多次扩容
+        params = dict(kwargs)
+        params.update(_base_params(task, model_cls, stage))
+
+        # 按任务类型的规则表做校验（代替逐类型 if/elif 链）
+        if requirements["prompt_required"] and not prompt:
+            raise ValueError(f"{task} task requires prompt")
+        provided = {
+            "input_image": input_image_path or input_image,
+            "input_video": input_video_path or input_video,
+            "last_frame": last_frame_path or last_frame,
         }
-        
-        # 根据任务类型验证必需参数
-        if task == "t2v" or task == "t2i":
-            # t2v 和 t2i 只需要 prompt
-            if not prompt:
-                raise ValueError(f"{task} task requires prompt")
-            params["prompt"] = prompt
-        elif task == "flf2v":
-            # flf2v 不需要 prompt，需要首帧和尾帧
-            if not input_image_path and not input_image:
-                raise ValueError("flf2v task requires input_image (first frame)")
-            if not last_frame_path and not last_frame:
-                raise ValueError("flf2v task requires last_frame (last frame)")
-            # prompt 可选
-            if prompt:
-                params["prompt"] = prompt
-        elif task == "animate":
-            # animate 不需要 prompt，需要图片和视频
-            if not input_image_path and not input_image:
-                raise ValueError("animate task requires input_image")
-            if not input_video_path and not input_video:
-                raise ValueError("animate task requires input_video")
-            # prompt 可选，默认使用 "视频中的人在做动作"
-            params["prompt"] = prompt if prompt else "视频中的人在做动作"
-        else:
-            # s2v, i2v, i2i 需要 prompt
-            if not prompt:
-                raise ValueError(f"{task} task requires prompt")
+        for field, message in requirements["media"]:
+            if not provided[field]:
+                raise ValueError(message)
+
+        if prompt:
             params["prompt"] = prompt
+        elif requirements.get("default_prompt"):
+            params["prompt"] = requirements["default_prompt"]
         
         # 处理输入图片
         if input_image_path:
@@ -264,28 +425,29 @@ class LightX2VClient:
                 # 多图模式（用于 i2i）
                 if task != "i2i":
                     raise ValueError("Multiple images only supported for i2i task")
-                params["input_image"] = self._encode_images(input_image_path)
+                params["input_image"] = await self._encode_images(input_image_path)
             else:
                 # 单图模式
-                params["input_image"] = self._encode_image(input_image_path)
+                # 编码放线程池，事件循环可继续跑其他协程的轮询
+                params["input_image"] = await asyncio.to_thread(self._encode_image, input_image_path)
         elif input_image:
             params["input_image"] = input_image
         
         # 处理输入音频（s2v 需要）
         if input_audio_path:
-            params["input_audio"] = self._encode_audio(input_audio_path)
+            params["input_audio"] = await asyncio.to_thread(self._encode_audio, input_audio_path)
         elif input_audio:
             params["input_audio"] = input_audio
         
         # 处理输入视频（animate 需要）
         if input_video_path:
-            params["input_video"] = self._encode_video(input_video_path)
+            params["input_video"] = await asyncio.to_thread(self._encode_video, input_video_path)
         elif input_video:
             params["input_video"] = input_video
         
         # 处理尾帧图片（flf2v 需要）
         if last_frame_path:
-            params["last_frame"] = self._encode_image(last_frame_path)
+            params["last_frame"] = await asyncio.to_thread(self._encode_image, last_frame_path)
         elif last_frame:
             params["last_frame"] = last_frame
         
@@ -304,29 +466,158 @@ class LightX2VClient:
         if aspect_ratio is not None:
             params["aspect_ratio"] = aspect_ratio
         
-        # 添加其他参数（如 cfg_scale, steps, guidance_scale 等）
-        params.update(kwargs)
-        
         # 发送请求
         url = f"{self.base_url}/api/v1/task/submit"
         logger.info(f"Submitting task to: {url}")
         logger.info(f"Task params: task={task}, model_cls={model_cls}, stage={stage}")
         
         try:
-            payload = json.dumps(params, ensure_ascii=False).encode("utf-8")
-            response = self.session.post(url, data=payload)
-            
-            if not await self.check_response(response, "LightX2VClient submit_task"):
-                return {"success": False, "error": f"HTTP {response.status_code}"}
-            
-            result = response.json()
-            logger.info(f"Task submitted successfully: task_id={result.get('task_id')}, task={task}")
+            if ORJSON_AVAILABLE:
+                # orjson 直接产出 UTF-8 字节，省去 dumps 后的整串 encode
+                payload = orjson.dumps(params)
+            else:
+                payload = json.dumps(params, ensure_ascii=False).encode("utf-8")
+
+            headers = self._json_headers
+            if GZIP_SUBMIT and len(payload) > _GZIP_MIN_SIZE:
+                # level=1 对 base64 文本已有 ~30% 压缩率，CPU 开销最小
+                payload = gzip.compress(payload, compresslevel=1)
+                headers = self._json_gzip_headers
+
+            session = await self._get_session()
+            async with session.post(url, data=payload, headers=headers) as response:
+                if not await self.check_response(response, "LightX2VClient submit_task"):
+                    return {"success": False, "error": f"HTTP {response.status}"}
+
+                result = await self._read_json(response)
+            task_id = result.get("task_id")
+            if task_id:
+                self._task_types[task_id] = task
+            logger.info(f"Task submitted successfully: task_id={task_id}, task={task}")
             return {"success": True, **result}
             
         except Exception as e:
             logger.error(f"LightX2VClient submit_task failed: {e}")
             return {"success": False, "error": str(e)}
-    
+
+    async def submit_tasks(self, params_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        并发提交多个任务
+
+        所有提交共享同一 aiohttp 连接池（keep-alive 复用连接），
+        N 个小 JSON 提交的总耗时接近 1 个 RTT，而不是串行的 N 个。
+
+        Args:
+            params_list: 每个元素是一份 submit_task 的关键字参数字典
+
+        Returns:
+            与 params_list 顺序一致的提交结果列表
+        """
+        return await asyncio.gather(
+            *(self.submit_task(**params) for params in params_list)
+        )
+
+    async def submit_task_multipart(
+        self,
+        task: str = "s2v",
+        model_cls: str = "SekoTalk",
+        stage: str = "single_stage",
+        prompt: str = "",
+        seed: Optional[int] = None,
+        input_image_path: Optional[str] = None,
+        input_audio_path: Optional[str] = None,
+        input_video_path: Optional[str] = None,
+        last_frame_path: Optional[str] = None,
+        negative_prompt: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        以 multipart/form-data 提交任务，文件直接流式上传
+
+        相比 base64-in-JSON 少约 33% 的传输字节，且完全跳过编码开销；
+        requests 会从文件对象分块读取，不在内存中物化完整文件。
+        需要服务端支持 multipart 提交；不支持时请使用 submit_task。
+        各文件参数除路径外也接受 (filename, bytes/file-like) 元组，
+        便于直接转发内存中的上传数据。
+
+        Args:
+            task: 任务类型
+            model_cls: 模型类别，默认 "SekoTalk"
+            stage: 处理阶段，默认 "single_stage"
+            prompt: 提示文本
+            seed: 随机种子
+            input_image_path: 输入图片文件路径
+            input_audio_path: 输入音频文件路径
+            input_video_path: 输入视频文件路径
+            last_frame_path: 尾帧图片文件路径
+            negative_prompt: 负面提示文本
+            **kwargs: 其他参数（如 cfg_scale, duration 等）
+
+        Returns:
+            包含 task_id 的字典
+        """
+        data = {
+            "task": task,
+            "model_cls": model_cls,
+            "stage": stage
+        }
+        if prompt:
+            data["prompt"] = prompt
+        if seed is not None:
+            data["seed"] = str(seed)
+        if negative_prompt:
+            data["negative_prompt"] = negative_prompt
+        for key, value in kwargs.items():
+            data[key] = value if isinstance(value, str) else str(value)
+
+        url = f"{self.base_url}/api/v1/task/submit"
+        logger.info(f"Submitting multipart task to: {url}")
+
+        file_fields = {
+            "input_image": input_image_path,
+            "input_audio": input_audio_path,
+            "input_video": input_video_path,
+            "last_frame": last_frame_path,
+        }
+
+        opened = []
+        try:
+            form = aiohttp.FormData()
+            for key, value in data.items():
+                form.add_field(key, value)
+            for field, value in file_fields.items():
+                if not value:
+                    continue
+                if isinstance(value, tuple):
+                    # (filename, bytes/file-like)：内存数据直接挂表单，不落盘
+                    filename, payload = value
+                    form.add_field(field, payload, filename=filename,
+                                   content_type="application/octet-stream")
+                else:
+                    f = open(value, "rb")
+                    opened.append(f)
+                    form.add_field(field, f, filename=os.path.basename(value),
+                                   content_type="application/octet-stream")
+
+            session = await self._get_session()
+            async with session.post(url, data=form) as response:
+                if not await self.check_response(response, "LightX2VClient submit_task_multipart"):
+                    return {"success": False, "error": f"HTTP {response.status}"}
+
+                result = await self._read_json(response)
+            task_id = result.get("task_id")
+            if task_id:
+                self._task_types[task_id] = task
+            logger.info(f"Task submitted successfully: task_id={task_id}, task={task}")
+            return {"success": True, **result}
+
+        except Exception as e:
+            logger.error(f"LightX2VClient submit_task_multipart failed: {e}")
+            return {"success": False, "error": str(e)}
+        finally:
+            for f in opened:
+                f.close()
+
     async def query_task(self, task_id: str) -> Dict[str, Any]:
         """
         查询任务状态
@@ -339,22 +630,83 @@ class LightX2VClient:
         """
         url = f"{self.base_url}/api/v1/task/query"
         params = {"task_id": task_id}
-        
+
         logger.info(f"Querying task: {task_id}")
-        
+
         try:
-            response = self.session.get(url, params=params)
-            
-            if not await self.check_response(response, "LightX2VClient query_task"):
-                return {"success": False, "error": f"HTTP {response.status_code}"}
-            
-            result = response.json()
-            return {"success": True, **result}
-            
+            # 带上上次的 ETag：状态未变时服务端可回 304，省掉响应体
+            cached = self._query_etags.get(task_id)
+            headers = {"If-None-Match": cached[0]} if cached else None
+
+            session = await self._get_session()
+            async with session.get(url, params=params, headers=headers) as response:
+                if response.status == 304 and cached:
+                    logger.info(f"Task {task_id} not modified (304)")
+                    return {"success": True, **cached[1]}
+
+                if not await self.check_response(response, "LightX2VClient query_task"):
+                    return {"success": False, "error": f"HTTP {response.status}"}
+
+                result = await self._read_json(response)
+                etag = response.headers.get("ETag")
+                if etag:
+                    self._query_etags[task_id] = (etag, result)
+            # 就地打标记而不是 {"success": True, **result} 再整份复制：
+            # 轮询循环每个 tick 都会走到这里，省一次字典重建
+            result["success"] = True
+            return result
+
         except Exception as e:
             logger.error(f"LightX2VClient query_task failed: {e}")
             return {"success": False, "error": str(e)}
     
+    async def _query_coalesced(self, task_id: str) -> Dict[str, Any]:
+        """
+        聚合式任务查询
+
+        并发等待 N 个任务时，各协程同一窗口（50ms）内的查询合并为
+        一次 query_tasks 批量调用，每个 tick 的 HTTP 请求数从 N 降到 1。
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            与 query_task 相同结构的结果
+        """
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._poll_waiters.setdefault(task_id, []).append(fut)
+        if self._poll_flush_task is None or self._poll_flush_task.done():
+            self._poll_flush_task = asyncio.ensure_future(self._flush_poll_waiters())
+        return await fut
+
+    async def _flush_poll_waiters(self):
+        """聚合窗口结束后批量查询并分发结果"""
+        await asyncio.sleep(0.05)
+        waiters, self._poll_waiters = self._poll_waiters, {}
+        # 立即卸任：批量查询在途期间新注册的等待者必须能排上新一轮 flush，
+        # 否则本轮等待者全部终态返回后，新等待者的 future 永远无人兑现
+        self._poll_flush_task = None
+        if not waiters:
+            return
+        try:
+            try:
+                results = await self.query_tasks(list(waiters))
+            except Exception as e:
+                for futs in waiters.values():
+                    for fut in futs:
+                        if not fut.done():
+                            fut.set_result({"success": False, "error": str(e)})
+                return
+            for tid, futs in waiters.items():
+                result = results.get(tid, {"success": False, "error": "Task not found"})
+                for fut in futs:
+                    if not fut.done():
+                        fut.set_result(result)
+        finally:
+            # 兜底：查询期间到达且尚无人接棒的等待者，在此补排一轮
+            if self._poll_waiters and (self._poll_flush_task is None or self._poll_flush_task.done()):
+                self._poll_flush_task = asyncio.ensure_future(self._flush_poll_waiters())
+
     async def wait_for_task(
         self,
         task_id: str,
@@ -376,28 +728,212 @@ class LightX2VClient:
         """
         start_time = time.time()
         logger.info(f"Waiting for task {task_id} to complete...")
-        
+
+        # 指数退避：短任务可以更快被发现；长任务在状态长期不变时
+        # 退避到 _MAX_POLL_INTERVAL，进一步减少无效往返
+        initial_delay = 0.2
+        max_delay = max(poll_interval, _MAX_POLL_INTERVAL)
+        delay = initial_delay
+        last_status = None
+
         while True:
             elapsed = time.time() - start_time
             if elapsed > timeout:
                 logger.warning(f"Task {task_id} timeout after {timeout}s")
                 return {"success": False, "error": "Timeout", "task_id": task_id}
-            
-            result = await self.query_task(task_id)
+
+            result = await self._query_coalesced(task_id)
             if not result.get("success"):
                 return result
-            
+
             task = result
             status = task.get("status", "UNKNOWN")
             logger.info(f"Task {task_id} status: {status} (elapsed: {elapsed:.1f}s)")
-            
+
             if check_status:
                 if status in ["SUCCEED", "FAILED", "CANCELLED"]:
                     logger.info(f"Task {task_id} finished with status: {status}")
                     return {"success": True, **task}
-            
-            await asyncio.sleep(poll_interval)
-    
+
+            if status != last_status:
+                # 状态变化说明任务在推进，重置退避以便更快捕获下一次变化
+                last_status = status
+                delay = initial_delay
+
+            # 服务端显式给出下次轮询建议时优先采纳，否则走指数退避
+            hint = task.get("next_poll_seconds")
+            if hint:
+                await asyncio.sleep(hint)
+            else:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2 + random.uniform(0, 0.1 * delay), max_delay)
+
+    async def wait_for_task_stream(
+        self,
+        task_id: str,
+        poll_interval: int = 5,
+        timeout: int = 3600
+    ) -> Dict[str, Any]:
+        """
+        通过 SSE 事件流等待任务完成
+
+        单个长连接代替反复 GET 轮询：服务端每次状态变化推送一条
+        `data: {...}` 事件。服务端不支持该接口（404）时自动回退到
+        wait_for_task 轮询。
+
+        Args:
+            task_id: 任务ID
+            poll_interval: 回退轮询时的间隔（秒）
+            timeout: 超时时间（秒）
+
+        Returns:
+            最终任务信息
+        """
+        url = f"{self.base_url}/api/v1/task/events"
+        params = {"task_id": task_id}
+
+        try:
+            session = await self._get_session()
+            async with session.get(
+                url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if response.status == 404:
+                    logger.info("Task event stream not supported, falling back to polling")
+                    return await self.wait_for_task(task_id, poll_interval=poll_interval, timeout=timeout)
+                if not await self.check_response(response, "LightX2VClient wait_for_task_stream"):
+                    return {"success": False, "error": f"HTTP {response.status}", "task_id": task_id}
+
+                async for raw_line in response.content:
+                    line = raw_line.strip()
+                    if not line.startswith(b"data:"):
+                        continue
+                    payload = line[len(b"data:"):].strip()
+                    if not payload:
+                        continue
+                    if ORJSON_AVAILABLE:
+                        event = orjson.loads(payload)
+                    else:
+                        event = json.loads(payload)
+
+                    status = event.get("status", "UNKNOWN")
+                    logger.info(f"Task {task_id} status: {status}")
+                    if status in ["SUCCEED", "FAILED", "CANCELLED"]:
+                        logger.info(f"Task {task_id} finished with status: {status}")
+                        return {"success": True, **event}
+
+            logger.warning(f"Task event stream for {task_id} closed without terminal status")
+            return await self.wait_for_task(task_id, poll_interval=poll_interval, timeout=timeout)
+
+        except asyncio.TimeoutError:
+            logger.warning(f"Task {task_id} timeout after {timeout}s")
+            return {"success": False, "error": "Timeout", "task_id": task_id}
+        except Exception as e:
+            logger.warning(f"Task event stream failed ({e}), falling back to polling")
+            return await self.wait_for_task(task_id, poll_interval=poll_interval, timeout=timeout)
+
+    async def query_tasks(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量查询任务状态
+
+        优先使用服务端批量接口（一次 POST 查询整批），不支持（404）时
+        回退为在共享连接池上 gather 并发单条查询。
+
+        Args:
+            task_ids: 任务ID列表
+
+        Returns:
+            task_id -> 查询结果 的字典
+        """
+        if self._batch_query_supported is not False and task_ids:
+            url = f"{self.base_url}/api/v1/task/query_batch"
+            try:
+                if ORJSON_AVAILABLE:
+                    payload = orjson.dumps({"task_ids": task_ids})
+                else:
+                    payload = json.dumps({"task_ids": task_ids}).encode("utf-8")
+                session = await self._get_session()
+                async with session.post(url, data=payload, headers=self._json_headers) as response:
+                    if response.status == 404:
+                        logger.info("Batch task query not supported, falling back to per-task queries")
+                        self._batch_query_supported = False
+                    elif await self.check_response(response, "LightX2VClient query_tasks"):
+                        self._batch_query_supported = True
+                        result = await self._read_json(response)
+                        tasks = result.get("tasks", result)
+                        if isinstance(tasks, list):
+                            tasks = {t.get("task_id"): t for t in tasks}
+                        return {
+                            tid: {"success": True, **tasks[tid]} if tid in tasks
+                            else {"success": False, "error": "Task not found"}
+                            for tid in task_ids
+                        }
+            except Exception as e:
+                logger.warning(f"Batch task query failed ({e}), falling back to per-task queries")
+
+        results = await asyncio.gather(*(self.query_task(tid) for tid in task_ids))
+        return dict(zip(task_ids, results))
+
+    async def wait_for_tasks(
+        self,
+        task_ids: List[str],
+        poll_interval: int = 5,
+        timeout: int = 3600
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        等待一批任务全部完成
+
+        每轮对所有未完成任务做一次批量查询，而不是为每个任务各开一个
+        独立轮询循环，HTTP 请求量随批量大小摊薄。
+
+        Args:
+            task_ids: 任务ID列表
+            poll_interval: 轮询间隔上限（秒）
+            timeout: 超时时间（秒）
+
+        Returns:
+            task_id -> 最终任务信息 的字典
+        """
+        start_time = time.time()
+        logger.info(f"Waiting for {len(task_ids)} tasks to complete...")
+
+        initial_delay = 0.2
+        max_delay = max(poll_interval, _MAX_POLL_INTERVAL)
+        delay = initial_delay
+        pending = list(dict.fromkeys(task_ids))
+        final: Dict[str, Dict[str, Any]] = {}
+
+        while pending:
+            elapsed = time.time() - start_time
+            if elapsed > timeout:
+                logger.warning(f"{len(pending)} tasks timeout after {timeout}s")
+                for tid in pending:
+                    final[tid] = {"success": False, "error": "Timeout", "task_id": tid}
+                break
+
+            results = await self.query_tasks(pending)
+            still_pending = []
+            for tid in pending:
+                result = results.get(tid, {"success": False, "error": "Task not found"})
+                if not result.get("success"):
+                    final[tid] = result
+                    continue
+                status = result.get("status", "UNKNOWN")
+                if status in ["SUCCEED", "FAILED", "CANCELLED"]:
+                    logger.info(f"Task {tid} finished with status: {status}")
+                    final[tid] = result
+                else:
+                    still_pending.append(tid)
+
+            if len(still_pending) != len(pending):
+                # 有任务完成说明批次在推进，重置退避
+                delay = initial_delay
+            pending = still_pending
+            if pending:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2 + random.uniform(0, 0.1 * delay), max_delay)
+
+        return final
+
     async def get_result_url(self, task_id: str, name: str = None) -> Optional[str]:
         """
         获取任务结果URL
@@ -412,16 +948,19 @@ class LightX2VClient:
             结果文件URL
         """
         if name is None:
-            # 根据任务类型自动选择默认输出名称
-            task_info = await self.query_task(task_id)
-            if task_info.get("success"):
-                task_type = task_info.get("task_type", "")
-                if task_type in ["i2i", "t2i"]:
-                    name = "output_image"
+            # 根据任务类型自动选择默认输出名称：提交时已记下任务类型，
+            # 命中缓存就省掉一次 query_task 往返
+            task_type = self._task_types.get(task_id)
+            if task_type is None:
+                task_info = await self.query_task(task_id)
+                if task_info.get("success"):
+                    task_type = task_info.get("task_type", "")
                 else:
-                    name = "output_video"
+                    task_type = ""
+            if task_type in ["i2i", "t2i"]:
+                name = "output_image"
             else:
-                name = "output_video"  # 默认值
+                name = "output_video"
         
         url = f"{self.base_url}/api/v1/task/result_url"
         params = {"task_id": task_id, "name": name}
@@ -429,12 +968,12 @@ class LightX2VClient:
         logger.info(f"Getting result URL for task {task_id}, output: {name}")
         
         try:
-            response = self.session.get(url, params=params)
-            
-            if not await self.check_response(response, "LightX2VClient get_result_url"):
-                return None
-            
-            result = response.json()
+            session = await self._get_session()
+            async with session.get(url, params=params) as response:
+                if not await self.check_response(response, "LightX2VClient get_result_url"):
+                    return None
+
+                result = await self._read_json(response)
             return result.get("url")
             
         except Exception as e:
@@ -458,18 +997,46 @@ class LightX2VClient:
         
         try:
             # LightX2V 服务端 cancel 接口是 GET，不是 POST
-            response = self.session.get(url, params=params)
-            
-            if not await self.check_response(response, "LightX2VClient cancel_task"):
-                return False
-            
-            result = response.json()
+            session = await self._get_session()
+            async with session.get(url, params=params) as response:
+                if not await self.check_response(response, "LightX2VClient cancel_task"):
+                    return False
+
+                result = await self._read_json(response)
             return result.get("msg") == "Task cancelled successfully"
             
         except Exception as e:
             logger.error(f"LightX2VClient cancel_task failed: {e}")
             return False
 
+    def cancel_task_nowait(self, task_id: str) -> bool:
+        """
+        尽力而为地取消任务（不等待服务端确认）
+
+        取消请求在后台任务中发出，调用方立即返回，适合 Ctrl-C 时
+        批量撤销任务。需要确认结果时用 cancel_task。
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            恒为 True（请求已排入后台发送）
+        """
+        bg_task = asyncio.ensure_future(self.cancel_task(task_id))
+        # 持有引用防止后台任务被垃圾回收，完成后自清理
+        self._bg_cancels.add(bg_task)
+
+        def _on_done(fut):
+            self._bg_cancels.discard(fut)
+            try:
+                if not fut.result():
+                    logger.warning(f"Background cancel of task {task_id} was not confirmed")
+            except Exception as e:
+                logger.warning(f"Background cancel of task {task_id} failed: {e}")
+
+        bg_task.add_done_callback(_on_done)
+        return True
+
     async def resume_task(self, task_id: str) -> Tuple[bool, Optional[str]]:
         """
         恢复/重试任务
@@ -486,16 +1053,19 @@ class LightX2VClient:
         logger.info(f"Resuming task: {task_id}")
         
         try:
-            response = self.session.get(url, params=params)
-            try:
-                result = response.json()
-            except Exception:
-                result = {}
+            session = await self._get_session()
+            async with session.get(url, params=params) as response:
+                try:
+                    result = await self._read_json(response)
+                except Exception:
+                    result = {}
+                if result is None:
+                    result = {}
 
-            if response.status_code not in [200, 201]:
-                err_msg = result.get("detail") or result.get("error") or result.get("msg") or response.text or f"HTTP {response.status_code}"
-                logger.warning(f"LightX2VClient resume_task: HTTP {response.status_code}, {err_msg}")
-                return (False, err_msg)
+                if response.status not in [200, 201]:
+                    err_msg = result.get("detail") or result.get("error") or result.get("msg") or await response.text() or f"HTTP {response.status}"
+                    logger.warning(f"LightX2VClient resume_task: HTTP {response.status}, {err_msg}")
+                    return (False, err_msg)
 
             if result.get("msg") == "ok":
                 return (True, None)
@@ -508,32 +1078,28 @@ class LightX2VClient:
             logger.error(f"LightX2VClient resume_task failed: {e}")
             return (False, err_msg)
     
-    def close(self):
+    async def close(self):
         """关闭会话"""
-        self.session.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
 
 
-async def test(args):
-    """
-    测试函数
-    
-    Args:
-        args: 命令行参数列表
-    """
+def _build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器（模块加载时执行一次，test 循环调用免重建）"""
     parser = argparse.ArgumentParser(description="LightX2V Client Test")
     parser.add_argument("--base_url", type=str, default=None, help="Service base URL")
     parser.add_argument("--token", type=str, default=None, help="Access token")
-    parser.add_argument("--task", type=str, default="s2v", 
+    parser.add_argument("--task", type=str, default="s2v",
                        choices=["s2v", "i2v", "t2v", "i2i", "t2i", "flf2v", "animate"],
                        help="Task type")
     parser.add_argument("--model", type=str, default="SekoTalk", help="Model class")
     parser.add_argument("--stage", type=str, default="single_stage", help="Stage")
     parser.add_argument("--prompt", type=str, default="", help="Prompt text")
-    parser.add_argument("--image", type=str, nargs="+", default=None, 
+    parser.add_argument("--image", type=str, nargs="+", default=None,
                        help="Input image path(s) - single or multiple for i2i")
     parser.add_argument("--audio", type=str, default=None, help="Input audio path (for s2v)")
     parser.add_argument("--video", type=str, default=None, help="Input video path (for animate)")
-    parser.add_argument("--last_frame", type=str, default=None, 
+    parser.add_argument("--last_frame", type=str, default=None,
                        help="Last frame image path (for flf2v)")
     parser.add_argument("--seed", type=int, help="Random seed")
     parser.add_argument("--custom_shape", type=str, default=None,
@@ -545,8 +1111,20 @@ async def test(args):
     parser.add_argument("--wait", action="store_true", help="Wait for task completion")
     parser.add_argument("--poll_interval", type=int, default=5, help="Poll interval in seconds")
     parser.add_argument("--timeout", type=int, default=3600, help="Timeout in seconds")
-    
-    parsed_args = parser.parse_args(args) if args else parser.parse_args()
+    return parser
+
+
+_PARSER = _build_parser()
+
+
+async def test(args):
+    """
+    测试函数
+
+    Args:
+        args: 命令行参数列表
+    """
+    parsed_args = _PARSER.parse_args(args) if args else _PARSER.parse_args()
     
     client = LightX2VClient(
         base_url=parsed_args.base_url,
@@ -630,7 +1208,19 @@ async def test(args):
             logger.info(f"Task ID: {task_id}, use --wait to monitor completion")
     
     finally:
-        client.close()
+        await client.close()
+
+
+@atexit.register
+def _close_shared_clients():
+    """进程退出时关闭 shared() 缓存的客户端会话"""
+    for client in LightX2VClient._shared_cache.values():
+        if client._session is not None and not client._session.closed:
+            try:
+                asyncio.run(client.close())
+            except RuntimeError:
+                # 事件循环仍在运行或已关闭时放弃清理，连接随进程退出释放
+                pass
 
 
 # 为了向后兼容，保留 S2VClient 作为别名
@@ -638,6 +1228,12 @@ S2VClient = LightX2VClient
 
 
 if __name__ == "__main__":
+    try:
+        # uvloop（libuv 事件循环）对 I/O 密集的轮询/并发提交快 2-4 倍
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(test(sys.argv[1:]))
 
 
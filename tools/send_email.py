@@ -1,67 +1,149 @@
+import copy
 import os
+import queue
+import re
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import json
+from types import SimpleNamespace
 from dotenv import load_dotenv
 
-load_dotenv()
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _loads(s):
+    """JSON 解析，优先 orjson（每条 SSE 行都要走一次，解析量大）"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
+def _dumps_indent(obj):
+    """缩进序列化，优先 orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+# 只还原 \uXXXX 转义，其他反斜杠序列（\n、\t 等）保持原样
+_UNICODE_ESCAPE_RE = re.compile(r'\\u[0-9a-fA-F]{4}')
+
+
+def _looks_like_json(payload: str) -> bool:
+    """粗筛完整 JSON：空串、[DONE] 哨兵、明显截断的行不值得进 json.loads"""
+    return bool(payload) and payload != '[DONE]' and payload[-1] in '}]'
+
+
+@lru_cache(maxsize=8192)
+def _ts_to_datetime(seconds: int) -> datetime:
+    """秒级时间戳 -> datetime，同一秒内的大量日志行共享一次解析"""
+    return datetime.fromtimestamp(seconds)
+
+
+@lru_cache(maxsize=8192)
+def _ts_to_str(seconds: int) -> str:
+    """秒级时间戳 -> 'YYYY-mm-dd HH:MM:SS'，strftime 结果按秒缓存"""
+    return _ts_to_datetime(seconds).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@lru_cache(maxsize=64)
+def _format_report_date(date: str) -> str:
+    """'YYYY-mm-dd' -> 'YYYY年mm月dd日'，重复日期免去 strptime/strftime"""
+    return datetime.strptime(date, "%Y-%m-%d").strftime("%Y年%m月%d日")
 
 
 class User:
     @classmethod
-    def format(cls, line):
-        res = ''
-        i = 0
-        while i < len(line):
-            if line[i:i + 2] == '\\u':
-                res += bytes(line[i:i + 6], 'utf-8').decode('unicode_escape')
-                i = i + 6
+    def from_batch(cls, rows):
+        """
+        批量构造 User
+
+        rows 为 (username, start_time, req_body, resp_body, status) 序列。
+        失败日志里请求/响应正文大量重复，相同正文只做一次完整解析，
+        其余行浅拷贝模板后只覆盖各自的用户名和时间戳。
+        """
+        users = []
+        templates = {}
+        for username, start_time, req_body, resp_body, status in rows:
+            key = (req_body, resp_body, status)
+            template = templates.get(key)
+            if template is None:
+                user = cls(username, start_time, req_body, resp_body, status)
+                templates[key] = user
             else:
-                res += line[i]
-                i += 1
-        return res
+                user = copy.copy(template)
+                user.username = username
+                user.start_time = start_time
+                user.start_date = _ts_to_datetime(start_time // 1000)
+            users.append(user)
+        return users
+
+    @classmethod
+    def format(cls, line):
+        # 正则一次扫描代替逐字符 Python 循环（含 O(n^2) 的 str +=）
+        return _UNICODE_ESCAPE_RE.sub(lambda m: chr(int(m.group()[2:], 16)), line)
 
     def __init__(self, username: str, start_time: int, req_body, resp_body, status):
         self.username = username
         self.start_time = start_time
-        self.start_date = datetime.fromtimestamp(start_time // 1000)
+        self.start_date = _ts_to_datetime(start_time // 1000)
 
         req_body = req_body
         resp_body = resp_body
         stream = False
         self.data_status = None
 
-        try:
-            self.req_body = json.loads(req_body)
-            if self.req_body.get('stream'):
-                stream = True
-            temp_req_body = self.req_body["messages"]
-            res = []
-            for tp in temp_req_body:
-                res.append({
-                    tp['role']: tp['content']
-                })
-            self.req_body = res
-        except Exception as e:
+        # 失败日志里 'None'/空串占比很高，先短路掉，省去异常展开的开销
+        if not req_body or req_body == 'None' or not req_body.lstrip().startswith(('{', '[')):
             self.req_body = req_body
+        else:
+            try:
+                self.req_body = _loads(req_body)
+                if self.req_body.get('stream'):
+                    stream = True
+                temp_req_body = self.req_body["messages"]
+                res = []
+                for tp in temp_req_body:
+                    res.append({
+                        tp['role']: tp['content']
+                    })
+                self.req_body = res
+            except Exception as e:
+                self.req_body = req_body
+
+        if not resp_body or resp_body == 'None':
+            self.resp_body = resp_body
+            self.session_id = None
+            self.status = status
+            if self.data_status is None and self.status == 200 and resp_body != "None" and req_body != 'None':
+                print()
+            return
 
         try:
             if not stream:
-                tmp_resp_body = json.loads(resp_body)
+                if not _looks_like_json(resp_body.strip() if resp_body else ''):
+                    raise ValueError('resp_body is not a complete JSON object')
+                tmp_resp_body = _loads(resp_body)
                 self.data_status = tmp_resp_body['data']['status']
                 self.resp_body = tmp_resp_body['data']['choices'][0]['message']
                 self.session_id = tmp_resp_body['data']['id']
             else:
-                res = resp_body.split('\n')
-                res = [r for r in res if r != '']
-                if len(res) == 1:
-                    res = res[-1]
-                else:
-                    res = res[-2]
-                res = json.loads(res[6:])
+                # 只切分/过滤一次，两个分支共用同一份行列表
+                lines = [r for r in resp_body.splitlines() if r]
+                target = lines[-1] if len(lines) == 1 else lines[-2]
+                payload = target[6:].rstrip()
+                if not _looks_like_json(payload):
+                    raise ValueError('terminal SSE line is not a complete JSON object')
+                res = _loads(payload)
                 self.data_status = res['data']['status']
                 if len(res['data']['choices']) > 0:
                     self.resp_body = res['data']['choices'][0].get('message')
@@ -71,18 +153,19 @@ class User:
                     self.session_id = res['data']['id']
 
                 if self.resp_body is None:
-                    self.resp_body = ''
-                    datas = resp_body.split('\n')
-                    datas = [data for data in datas if data != '']
-                    for data in datas[:-1]:
-                        if data == '':
+                    # 增量拼接走 list + join，避免 str += 的二次复制
+                    deltas = []
+                    for data in lines[:-1]:
+                        payload = data[6:].rstrip()
+                        if not _looks_like_json(payload):
                             continue
-                        res = json.loads(data[6:])
+                        res = _loads(payload)
                         self.data_status = res['data']['status']
                         if len(res['data']['choices']) == 0:
                             continue
-                        self.resp_body += res['data']['choices'][0]['delta']
+                        deltas.append(res['data']['choices'][0]['delta'])
                         self.session_id = res['data']['id']
+                    self.resp_body = ''.join(deltas)
         except Exception as e:
             self.resp_body = resp_body
             self.session_id = None
@@ -95,44 +178,170 @@ class User:
         return self.start_time < other.start_time
 
     def to_list(self):
-        return [self.username, self.start_date.strftime("%Y-%m-%d %H:%M:%S"), json.dumps(self.req_body, ensure_ascii=False, indent=2), self.resp_body, self.status,
+        return [self.username, _ts_to_str(self.start_time // 1000), _dumps_indent(self.req_body), self.resp_body, self.status,
                 self.data_status, '', '', '', '', self.session_id]
 
 
-MAIL_SERVER = os.getenv('MAIL_SERVER')
-MAIL_PORT = os.getenv('MAIL_PORT')
-MAIL_USE_TLS = os.getenv('MAIL_USE_TLS') == "True"
-MAIL_USERNAME = os.getenv('MAIL_USERNAME')
-MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
-MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
+@lru_cache(maxsize=1)
+def _mail_cfg():
+    """首次发信时才读 .env / 环境变量，仅解析日志的调用方不碰磁盘"""
+    load_dotenv()
+    port = os.getenv('MAIL_PORT')
+    return SimpleNamespace(
+        server=os.getenv('MAIL_SERVER'),
+        port=int(port) if port else None,
+        use_tls=os.getenv('MAIL_USE_TLS') == "True",
+        username=os.getenv('MAIL_USERNAME'),
+        password=os.getenv('MAIL_PASSWORD'),
+        sender=os.getenv("MAIL_DEFAULT_SENDER"),
+    )
+
+
 JSON_AS_ASCII = False
 
 
-def send_email(date: datetime, user_emails: list,cc_user_emails:list):
+class SMTPMailer:
+    """
+    可复用的 SMTP 会话
+
+    连接、STARTTLS、登录只做一次，之后可多次 send()；批量发信时
+    握手/认证开销被摊薄到整批邮件上。用作上下文管理器，退出时 quit。
+    """
+
+    def __init__(self, server=None, port=None, username=None, password=None, use_tls=None):
+        cfg = _mail_cfg()
+        self.host = server or cfg.server
+        self.port = port or cfg.port
+        self.username = username or cfg.username
+        self.password = password or cfg.password
+        self.use_tls = cfg.use_tls if use_tls is None else use_tls
+        self.server = None
+
+    def __enter__(self):
+        self.server = smtplib.SMTP(self.host, self.port)
+        if self.use_tls:
+            self.server.starttls()
+        self.server.login(self.username, self.password)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+        return False
+
+    def send(self, sender, recipients, message):
+        """在已建立的会话上发送一封邮件"""
+        self.server.sendmail(sender, recipients, message.as_string())
+
+
+class SMTPPool:
+    """
+    有界 SMTP 连接池
+
+    size 个已登录的长连接由各工作线程复用，独立 TLS 会话上的 DATA
+    传输相互重叠；单连接发满 max_messages_per_conn 封后关闭重建，
+    避免触发服务商的单连接限额。
+    """
+
+    def __init__(self, size: int = 5, max_messages_per_conn: int = 100):
+        self.size = size
+        self.max_messages_per_conn = max_messages_per_conn
+        self._pool = queue.Queue(maxsize=size)
+        # 惰性建连：占位 None，首次取用时才真正登录
+        for _ in range(size):
+            self._pool.put([None, 0])
+
+    @contextmanager
+    def acquire(self):
+        """取出一个已登录连接，用完放回（超量则回收重建）"""
+        slot = self._pool.get()
+        try:
+            if slot[0] is None:
+                slot[0] = SMTPMailer().__enter__()
+            yield slot[0]
+            slot[1] += 1
+        except Exception:
+            # 连接状态不明，丢弃重建
+            if slot[0] is not None:
+                slot[0].__exit__(None, None, None)
+            slot[0], slot[1] = None, 0
+            raise
+        finally:
+            if slot[0] is not None and slot[1] >= self.max_messages_per_conn:
+                slot[0].__exit__(None, None, None)
+                slot[0], slot[1] = None, 0
+            self._pool.put(slot)
+
+    def send(self, sender, recipients, message):
+        """通过池中任一连接发送一封邮件"""
+        with self.acquire() as mailer:
+            mailer.send(sender, recipients, message)
+
+    def send_many(self, jobs, max_workers: int = None):
+        """
+        并行发送一批邮件
+
+        Args:
+            jobs: (sender, recipients, message) 三元组列表
+            max_workers: 并行度，默认与池大小一致
+
+        Returns:
+            与 jobs 顺序一致的结果列表（成功为 None，失败为异常对象）
+        """
+        results = [None] * len(jobs)
+
+        def _send_one(index, job):
+            try:
+                self.send(*job)
+            except Exception as e:
+                results[index] = e
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.size) as executor:
+            futures = [executor.submit(_send_one, i, job) for i, job in enumerate(jobs)]
+            for future in futures:
+                future.result()
+        return results
+
+    def close(self):
+        """关闭池中所有连接"""
+        while not self._pool.empty():
+            slot = self._pool.get_nowait()
+            if slot[0] is not None:
+                slot[0].__exit__(None, None, None)
+
+
+def send_email(date: datetime, user_emails: list, cc_user_emails: list, mailer: SMTPMailer = None):
     try:
-        with smtplib.SMTP(MAIL_SERVER, MAIL_PORT) as server:
-            server.connect(MAIL_SERVER)
-            server.starttls()
-            server.login(MAIL_USERNAME, MAIL_PASSWORD)
-            date_object = datetime.strptime(date, "%Y-%m-%d")
-            date_string = date_object.strftime("%Y年%m月%d日")
-            # date_string = date.strftime("%Y年%m月%d日")
-
-            message = MIMEMultipart()
-            message['From'] = MAIL_DEFAULT_SENDER
-            message['To'] = ','.join(user_emails)
-            message['Cc'] = ','.join(cc_user_emails)
-            message['Subject'] = "To C后端数据飞轮报告 - 商量"  # 替换为您的邮件主题
-            print(message)
-            html_part = MIMEText(get_email(date_string), 'html')
-            message.attach(html_part)
-            server.sendmail(MAIL_DEFAULT_SENDER, user_emails + cc_user_emails, message.as_string())
+        date_string = _format_report_date(date)
+        # date_string = date.strftime("%Y年%m月%d日")
+
+        sender = _mail_cfg().sender
+        message = MIMEMultipart()
+        message['From'] = sender
+        message['To'] = ','.join(user_emails)
+        message['Cc'] = ','.join(cc_user_emails)
+        message['Subject'] = "To C后端数据飞轮报告 - 商量"  # 替换为您的邮件主题
+        print(message)
+        html_part = MIMEText(get_email(date_string), 'html')
+        message.attach(html_part)
+
+        recipients = user_emails + cc_user_emails
+        if mailer is not None:
+            # 复用调用方的长连接，循环发送时免去重复握手/登录
+            mailer.send(sender, recipients, message)
+        else:
+            with SMTPMailer() as one_shot:
+                one_shot.send(sender, recipients, message)
     except Exception as e:
         print('邮件发送失败:', str(e))
 
 
-def get_email(date):
-    return '''
+# 邮件 HTML 模板在导入时切成首尾两段，get_email 只做一次字符串拼接
+_EMAIL_HEAD = '''
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -195,7 +404,9 @@ def get_email(date):
     </div>
     <div class="content">
         <p>Hi all,</p>
-        <p>%s数据飞轮报告已更新。</p>
+        <p>'''
+
+_EMAIL_TAIL = '''数据飞轮报告已更新。</p>
         <p class="report">
             <a href="https://sensechat-yue.netlify.app/">sensechat-粤语数据报告</a>
         </p>
@@ -217,7 +428,11 @@ def get_email(date):
 </div>
 </body>
 </html>
- ''' % (date)
+ '''
+
+
+def get_email(date):
+    return _EMAIL_HEAD + date + _EMAIL_TAIL
 
 from collections import defaultdict
 from datetime import datetime
@@ -8,16 +8,40 @@
 import os
 import json
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from loguru import logger
 
 try:
-    from bs4 import BeautifulSoup
+    from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    from bs4 import BeautifulSoup, SoupStrainer
     BS4_AVAILABLE = True
+    # 不需要正文时只物化这些标签，解析树小很多
+    _META_STRAINER = SoupStrainer(["title", "meta", "a"])
 except ImportError:
     BS4_AVAILABLE = False
-    logger.warning("BeautifulSoup4 is not installed. Install it with: pip install beautifulsoup4")
+    if not SELECTOLAX_AVAILABLE:
+        logger.warning("BeautifulSoup4 is not installed. Install it with: pip install beautifulsoup4")
+
+# 模块级 Session：同一主机的后续请求复用连接池，省掉 TCP/TLS 握手
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# 单页下载上限，防止超大页面把内存打爆
+_MAX_FETCH_BYTES = int(os.getenv("WEB_FETCH_MAX_BYTES", 10 * 1024 * 1024))
 
 
 def fetch_webpage(
@@ -78,57 +102,140 @@ def fetch_webpage(
     
     try:
         logger.info(f"Fetching webpage: {url}")
-        response = requests.get(url, headers=default_headers, timeout=timeout)
-        response.raise_for_status()
-        
-        # 检查内容类型
-        content_type = response.headers.get("Content-Type", "").lower()
-        if "text/html" not in content_type and "application/xhtml" not in content_type:
-            return {
-                "status": "failed",
-                "error": f"Content type is not HTML: {content_type}",
-                "url": url,
-                "status_code": response.status_code,
-                "content_type": content_type
-            }
-        
-        html_content = response.text
+        with _SESSION.get(url, headers=default_headers, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+
+            # 检查内容类型（流式模式下在下载正文前就能短路）
+            content_type = response.headers.get("Content-Type", "").lower()
+            if "text/html" not in content_type and "application/xhtml" not in content_type:
+                return {
+                    "status": "failed",
+                    "error": f"Content type is not HTML: {content_type}",
+                    "url": url,
+                    "status_code": response.status_code,
+                    "content_type": content_type
+                }
+
+            # 分块读取并限制总大小，避免一次性把超大正文读进内存
+            chunks = []
+            total = 0
+            for chunk in response.iter_content(chunk_size=65536):
+                total += len(chunk)
+                if total > _MAX_FETCH_BYTES:
+                    return {
+                        "status": "failed",
+                        "error": f"Page too large (> {_MAX_FETCH_BYTES} bytes)",
+                        "url": url,
+                        "status_code": response.status_code,
+                        "content_type": content_type
+                    }
+                chunks.append(chunk)
+
+            encoding = response.encoding or "utf-8"
+            status_code = response.status_code
+
+        html_content = b"".join(chunks).decode(encoding, errors="replace")
         result = {
             "status": "success",
             "url": url,
-            "status_code": response.status_code,
+            "status_code": status_code,
             "content_type": content_type,
             "content_length": len(html_content)
         }
         
+        # 优先使用 selectolax（C 实现，比 html.parser 快一个数量级以上）
+        if SELECTOLAX_AVAILABLE:
+            try:
+                tree = HTMLParser(html_content)
+
+                # 提取标题
+                title_node = tree.css_first("title")
+                result["title"] = title_node.text(strip=True) if title_node else ""
+
+                # 提取 meta 信息（单次遍历；description 按既有优先级回填）
+                meta_info = {}
+                for meta in tree.css("meta"):
+                    attrs = meta.attributes
+                    name = attrs.get("name") or attrs.get("property")
+                    content = attrs.get("content")
+                    if not name or not content:
+                        continue
+                    meta_info[name.lower()] = content
+
+                if "description" not in meta_info:
+                    description = meta_info.get("og:description") or meta_info.get("twitter:description")
+                    if description:
+                        meta_info["description"] = description
+
+                result["meta"] = meta_info
+
+                # 提取纯文本
+                if extract_text:
+                    # 移除 script 和 style 标签
+                    for node in tree.css("script, style, noscript"):
+                        node.decompose()
+
+                    # 获取文本内容
+                    body = tree.body or tree.root
+                    text = body.text(separator="\n") if body else ""
+                    # 清理多余的空白行：单次生成器遍历，不物化中间列表
+                    result["text"] = "\n".join(filter(None, (line.strip() for line in text.splitlines())))
+                else:
+                    result["html"] = html_content
+
+                # 提取链接
+                if extract_links:
+                    links = []
+                    for link in tree.css("a[href]"):
+                        href = link.attributes.get("href")
+                        if not href:
+                            continue
+                        text = link.text(strip=True)
+                        # 处理相对链接
+                        if href.startswith("/"):
+                            parsed_url = urlparse(url)
+                            href = f"{parsed_url.scheme}://{parsed_url.netloc}{href}"
+                        elif not href.startswith(("http://", "https://")):
+                            continue
+                        links.append({
+                            "url": href,
+                            "text": text
+                        })
+                    result["links"] = links
+
+                return result
+
+            except Exception as e:
+                logger.warning(f"Failed to parse HTML with selectolax: {e}")
+                # 解析失败则回退到 BeautifulSoup（下方分支）
+
         # 如果安装了 BeautifulSoup，进行内容提取
         if BS4_AVAILABLE:
             try:
-                soup = BeautifulSoup(html_content, "html.parser")
-                
+                if extract_text:
+                    soup = BeautifulSoup(html_content, "html.parser")
+                else:
+                    # 只取 title/meta/链接时用 strainer 裁剪解析树
+                    soup = BeautifulSoup(html_content, "html.parser", parse_only=_META_STRAINER)
+
                 # 提取标题
                 title_tag = soup.find("title")
                 result["title"] = title_tag.get_text(strip=True) if title_tag else ""
                 
-                # 提取 meta 信息
+                # 提取 meta 信息（单次遍历；description 按既有优先级回填）
                 meta_info = {}
-                meta_tags = soup.find_all("meta")
-                for meta in meta_tags:
+                for meta in soup.find_all("meta"):
                     name = meta.get("name") or meta.get("property")
                     content = meta.get("content")
-                    if name and content:
-                        meta_info[name.lower()] = content
-                
-                # 提取 description
-                description = (
-                    meta_info.get("description") or
-                    meta_info.get("og:description") or
-                    meta_info.get("twitter:description") or
-                    ""
-                )
-                if description:
-                    meta_info["description"] = description
-                
+                    if not name or not content:
+                        continue
+                    meta_info[name.lower()] = content
+
+                if "description" not in meta_info:
+                    description = meta_info.get("og:description") or meta_info.get("twitter:description")
+                    if description:
+                        meta_info["description"] = description
+
                 result["meta"] = meta_info
                 
                 # 提取纯文本
@@ -139,9 +246,8 @@ def fetch_webpage(
                     
                     # 获取文本内容
                     text = soup.get_text(separator="\n", strip=True)
-                    # 清理多余的空白行
-                    lines = [line.strip() for line in text.split("\n") if line.strip()]
-                    result["text"] = "\n".join(lines)
+                    # 清理多余的空白行：单次生成器遍历，不物化中间列表
+                    result["text"] = "\n".join(filter(None, (line.strip() for line in text.splitlines())))
                 else:
                     result["html"] = html_content
                 
@@ -202,6 +308,41 @@ def fetch_webpage(
         }
 
 
+def fetch_webpages(
+    urls: List[str],
+    max_workers: int = 10,
+    **kwargs
+) -> List[Dict[str, Any]]:
+    """
+    并发批量获取多个网页（线程池，网络 I/O 期间释放 GIL）
+
+    Args:
+        urls: 要获取的 URL 列表
+        max_workers: 最大并发线程数，默认 10
+        **kwargs: 透传给 fetch_webpage 的其他参数
+
+    Returns:
+        与 urls 顺序一致的结果字典列表，每项结构同 fetch_webpage
+    """
+    if not urls:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_webpage, u, **kwargs): i for i, u in enumerate(urls)}
+        results: List[Optional[Dict[str, Any]]] = [None] * len(urls)
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                results[index] = {
+                    "status": "failed",
+                    "error": f"Unexpected error: {str(e)}",
+                    "url": urls[index]
+                }
+    return results
+
+
 def fetch_webpage_simple(url: str, timeout: int = 30) -> str:
     """
     简单获取网页文本内容（便捷函数）
@@ -1,13 +1,66 @@
 import os
+import copy
 import json
 import time
+import threading
 import requests
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 from duckduckgo_search import DDGS
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 load_dotenv()
 
+# 模块级 Session：Brave 回退总是打同一主机，复用连接池省掉每次的 TLS 握手
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+
+# Brave 请求里不变的部分提升到模块级，每次调用只叠加动态字段
+_BRAVE_HEADERS_BASE = {"Accept": "application/json"}
+_BRAVE_PARAMS_BASE = {
+    "search_lang": "en",  # Force English results
+    "country": "us",  # US region
+    "safesearch": "moderate"
+}
+
+# 相同查询参数的结果短期缓存：命中时省掉整个网络往返
+_SEARCH_CACHE: Dict[tuple, tuple] = {}  # key -> (过期时刻, result)
+_SEARCH_CACHE_TTL = 300  # 秒
+_SEARCH_CACHE_MAX = 1024
+_SEARCH_LOCK = threading.Lock()
+
+
+def _dumps(obj) -> str:
+    """结果序列化，优先 orjson（orjson 原生输出 UTF-8，无需 ensure_ascii）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _save_result(result: Dict[str, Any], save_path: str) -> None:
+    """把结果写到绝对路径；不改 cwd，多线程下安全"""
+    full = Path(save_path)
+    if not full.is_absolute():
+        full = Path.cwd() / full
+    full.parent.mkdir(parents=True, exist_ok=True)
+    if ORJSON_AVAILABLE:
+        full.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+    else:
+        full.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+
 
 def web_search(
     query: str,
@@ -15,6 +68,7 @@ def web_search(
     timeout_seconds: int = 20,
     region: str = "us-en",  # Default to US English
     safesearch: str = "moderate",
+    save_path: Optional[str] = None,
 ) -> Dict[str, Any]:
 
     if not query or not isinstance(query, str) or not query.strip():
@@ -27,6 +81,23 @@ def web_search(
             }
         }
 
+    cache_key = (query.strip().lower(), num_results, region, safesearch)
+    cached = None
+    with _SEARCH_LOCK:
+        hit = _SEARCH_CACHE.get(cache_key)
+        if hit is not None:
+            if hit[0] > time.monotonic():
+                cached = copy.deepcopy(hit[1])
+            else:
+                del _SEARCH_CACHE[cache_key]
+    if cached is not None:
+        if save_path:
+            try:
+                _save_result(cached, save_path)
+            except OSError as e:
+                print(f"⚠️ Failed to save search results to {save_path}: {e}")
+        return cached
+
     # Try DuckDuckGo first
     try:
         print(f"🔍 Trying DuckDuckGo search (region: {region})...")
@@ -67,7 +138,7 @@ def web_search(
                 "query": query,
                 "num_results_requested": num_results,
                 "num_results_returned": len(search_results),
-                "results_json_string": json.dumps(search_results, ensure_ascii=False)
+                "results_json_string": _dumps(search_results)
             }
         }
 
@@ -85,18 +156,9 @@ def web_search(
             }
 
         try:
-            headers = {
-                "Accept": "application/json",
-                "X-Subscription-Token": api_key
-            }
-            params = {
-                "q": query,
-                "count": num_results,
-                "search_lang": "en",  # Force English results
-                "country": "us",  # US region
-                "safesearch": "moderate"
-            }
-            response = requests.get(
+            headers = {**_BRAVE_HEADERS_BASE, "X-Subscription-Token": api_key}
+            params = {**_BRAVE_PARAMS_BASE, "q": query, "count": num_results}
+            response = _SESSION.get(
                 "https://api.search.brave.com/res/v1/web/search",
                 headers=headers,
                 params=params,
@@ -104,7 +166,12 @@ def web_search(
             )
             response.raise_for_status()
 
-            raw_results = response.json().get("web", {}).get("results", [])
+            # 直接用 orjson 解析原始字节：跳过 .text 的解码和 stdlib json
+            if ORJSON_AVAILABLE:
+                payload = orjson.loads(response.content)
+            else:
+                payload = response.json()
+            raw_results = payload.get("web", {}).get("results", [])
             search_results = []
             for r in raw_results:
                 title = r.get("title", "N/A")
@@ -131,7 +198,7 @@ def web_search(
                     "query": query,
                     "num_results_requested": num_results,
                     "num_results_returned": len(search_results),
-                    "results_json_string": json.dumps(search_results, ensure_ascii=False)
+                    "results_json_string": _dumps(search_results)
                 }
             }
 
@@ -145,6 +212,22 @@ def web_search(
                 }
             }
 
+    if save_path:
+        try:
+            _save_result(result, save_path)
+        except OSError as e:
+            print(f"⚠️ Failed to save search results to {save_path}: {e}")
+
+    # 只缓存成功结果；失败分支都已提前 return
+    with _SEARCH_LOCK:
+        if len(_SEARCH_CACHE) >= _SEARCH_CACHE_MAX:
+            now = time.monotonic()
+            for key in [k for k, v in _SEARCH_CACHE.items() if v[0] <= now]:
+                del _SEARCH_CACHE[key]
+            if len(_SEARCH_CACHE) >= _SEARCH_CACHE_MAX:
+                _SEARCH_CACHE.clear()
+        _SEARCH_CACHE[cache_key] = (time.monotonic() + _SEARCH_CACHE_TTL, copy.deepcopy(result))
+
     return result
 
 if __name__ == "__main__":
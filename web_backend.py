@@ -3,22 +3,59 @@
 """
 import asyncio
 import os
-import uuid
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 from typing import List, Optional, Dict, Any
-import base64
+import hashlib
+import io
 import tempfile
+import time
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+try:
+    # ORJSONResponse 在 render 时硬性要求 orjson，先确认可导入再启用
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from tools.s2v_client import S2VClient
 
-app = FastAPI(title="S2V Batch API Service")
+try:
+    import aiofiles
+    AIOFILES_AVAILABLE = True
+except ImportError:
+    AIOFILES_AVAILABLE = False
+
+try:
+    # pybase64 的 SIMD 实现编码/解码约快 4 倍，未安装时退回标准库
+    from pybase64 import b64encode as _b64encode, b64decode as _b64decode
+except ImportError:
+    from base64 import b64encode as _b64encode, b64decode as _b64decode
+
+# orjson 在 C 层序列化响应，轮询接口高频调用时省下可观的 CPU；缺省时退回 stdlib json
+app = FastAPI(title="S2V Batch API Service", default_response_class=DefaultResponse)
+
+
+class CachedStaticFiles(StaticFiles):
+    """带长缓存头的静态文件服务：指纹资源命中浏览器缓存后不再回源"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+# 生产环境由 nginx 托管前端；本地直跑时若存在 static/ 目录则由后端代管
+_STATIC_DIR = Path(__file__).parent / "static"
+if _STATIC_DIR.is_dir():
+    app.mount("/static", CachedStaticFiles(directory=_STATIC_DIR), name="static")
 
 # 配置 CORS
 app.add_middleware(
@@ -29,17 +66,95 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 任务存储（生产环境应该使用数据库）
-tasks_db: Dict[str, Dict[str, Any]] = {}
+class TaskStore:
+    """
+    进程内任务存储（生产环境应该使用数据库/Redis）
+
+    dict 本身按插入序排列，而任务恰好按创建时间插入，所以倒序分页
+    只需从尾部惰性切片，列表接口从全量拷贝+排序降为 O(limit)。
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._tasks
+
+    def __getitem__(self, task_id: str) -> Dict[str, Any]:
+        return self._tasks[task_id]
+
+    def __setitem__(self, task_id: str, record: Dict[str, Any]) -> None:
+        self._tasks[task_id] = record
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def list_page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """按创建时间倒序取一页，不物化整个历史"""
+        return list(islice(reversed(self._tasks.values()), offset, offset + limit))
+
+
+# 任务存储
+tasks_db = TaskStore()
 
 # 全局客户端（从环境变量读取配置）
 BASE_URL = os.getenv("LIGHTX2V_BASE_URL", "https://x2v.light-ai.top")
 ACCESS_TOKEN = os.getenv("LIGHTX2V_ACCESS_TOKEN", "")
+# 服务端支持 multipart 提交时置 1：原始字节直接转发，跳过 base64 编码和 33% 膨胀
+MULTIPART_SUBMIT = os.getenv("S2V_MULTIPART_SUBMIT", "0") == "1"
+# 本服务对外可达的地址；配置后提交时附带回调 URL，完成状态由 S2V 推送而非轮询
+WEBHOOK_BASE_URL = os.getenv("S2V_WEBHOOK_BASE_URL", "").rstrip("/")
+
+# 等待中的任务完成事件，webhook 到达时唤醒
+_completion_events: Dict[str, asyncio.Event] = {}
+
+# 上游并发上限：突发提交在本地排队，而不是打垮 S2V API
+_INFLIGHT = asyncio.Semaphore(int(os.getenv("S2V_MAX_INFLIGHT", "32")))
+
+# singleflight：同一上游任务同时只保留一个在途状态查询，并发请求搭车等结果
+_status_inflight: Dict[str, asyncio.Future] = {}
+
+# 状态新鲜度窗口：窗口内的重复轮询直接用本地记录，不再打上游
+_STATUS_TTL = float(os.getenv("S2V_STATUS_TTL", "3"))
+_status_fresh: Dict[str, float] = {}  # api_task_id -> 上次成功刷新时刻
+
+# 后台任务强引用：防止 GC 提前回收，并统一消化异常
+_bg_tasks: set = set()
+
+
+def _on_bg_done(task: "asyncio.Task") -> None:
+    _bg_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"⚠️ 后台任务异常: {task.exception()}")
+
+
+def _spawn(coro) -> "asyncio.Task":
+    """启动后台协程并持有引用，完成后自动清理"""
+    task = asyncio.create_task(coro)
+    _bg_tasks.add(task)
+    task.add_done_callback(_on_bg_done)
+    return task
 
 if not ACCESS_TOKEN:
     print("⚠️  警告: 未设置 LIGHTX2V_ACCESS_TOKEN 环境变量")
 
 
+@app.on_event("startup")
+async def _init_client():
+    """进程内共享一个客户端，连接池跨请求复用，省掉每次的 TCP/TLS 握手"""
+    app.state.s2v = S2VClient(base_url=BASE_URL, access_token=ACCESS_TOKEN)
+
+
+@app.on_event("shutdown")
+async def _close_client():
+    await app.state.s2v.close()
+
+
+def get_client() -> S2VClient:
+    """返回进程级共享客户端"""
+    return app.state.s2v
+
+
 class TaskRequest(BaseModel):
     """单个任务请求"""
     prompt: str
@@ -59,36 +174,95 @@ class BatchTaskRequest(BaseModel):
     timeout: Optional[int] = 3600
 
 
+# 上传分块读的块大小；64KiB 在接收与编码之间取得平衡
+_UPLOAD_CHUNK = 64 * 1024
+
+# 单个上传文件的体积上限，超限直接 413，不读进内存
+MAX_UPLOAD_BYTES = int(os.getenv("S2V_MAX_UPLOAD_BYTES", 100 * 1024 * 1024))
+
+
+def _check_upload_size(upload_file: Optional[UploadFile]) -> None:
+    """按 Starlette 填充的 size 快速失败；size 缺失时由分块读兜底"""
+    if upload_file is None:
+        return
+    size = getattr(upload_file, "size", None)
+    if size and size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+
+
 async def read_upload_to_base64_dict(upload_file: Optional[UploadFile]) -> Optional[Dict[str, str]]:
-    """将上传文件读入内存并转为 base64 字典，不写盘。供 API 直接使用。"""
+    """将上传文件分块读入并增量转 base64，不写盘。峰值内存只比结果多一个分块。"""
     if not upload_file or not upload_file.filename:
         return None
-    content = await upload_file.read()
-    if not content:
+    _check_upload_size(upload_file)
+    buf = io.BytesIO()
+    carry = b""
+    total = 0
+    while True:
+        chunk = await upload_file.read(_UPLOAD_CHUNK)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+        data = carry + chunk
+        # base64 按 3 字节分组，余数留到下一块再编码
+        usable = len(data) - (len(data) % 3)
+        buf.write(_b64encode(data[:usable]))
+        carry = data[usable:]
+    if carry:
+        buf.write(_b64encode(carry))
+    encoded = buf.getvalue()
+    if not encoded:
         return None
-    return {"type": "base64", "data": base64.b64encode(content).decode("utf-8")}
+    return {"type": "base64", "data": encoded.decode("ascii")}
+
+
+def _now() -> str:
+    """当前时间的 ISO 字符串；同一次状态变更内只取一次"""
+    return datetime.now().isoformat()
+
+
+def _upload_bytes(upload_dict: Dict[str, Any]) -> bytes:
+    """取上传字典的原始字节：multipart 路径存 bytes，base64 路径存字符串"""
+    data = upload_dict["data"]
+    return data if isinstance(data, bytes) else _b64decode(data)
+
+
+# 审计写盘专用小线程池：上传洪峰不会挤占 FastAPI 的默认同步线程池
+_SAVE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="s2v-audit")
+
 
+async def _write_file(path: Path, data: bytes) -> None:
+    """异步写单个文件；无 aiofiles 时退到专用线程池，避免阻塞事件循环"""
+    if AIOFILES_AVAILABLE:
+        async with aiofiles.open(path, "wb") as f:
+            await f.write(data)
+    else:
+        await asyncio.get_running_loop().run_in_executor(_SAVE_POOL, path.write_bytes, data)
 
-def _save_uploads_background_sync(
+
+async def _save_uploads(
     task_id: str,
     image_dict: Optional[Dict[str, str]],
     audio_dict: Optional[Dict[str, str]],
     image_filename: Optional[str],
     audio_filename: Optional[str],
 ) -> None:
-    """在后台同步写盘，不阻塞主流程。仅用于审计/备份，API 提交不依赖此步骤。"""
+    """在后台异步写盘，不占用默认线程池。仅用于审计/备份，API 提交不依赖此步骤。"""
     if not image_dict and not audio_dict:
         return
     temp_dir = Path(tempfile.gettempdir()) / "s2v_uploads"
     temp_dir.mkdir(parents=True, exist_ok=True)
+    writes = []
     if image_dict and image_dict.get("data") and image_filename:
         ext = Path(image_filename).suffix or ".png"
-        path = temp_dir / f"{task_id}_image{ext}"
-        path.write_bytes(base64.b64decode(image_dict["data"]))
+        writes.append(_write_file(temp_dir / f"{task_id}_image{ext}", _upload_bytes(image_dict)))
     if audio_dict and audio_dict.get("data") and audio_filename:
         ext = Path(audio_filename).suffix or ".wav"
-        path = temp_dir / f"{task_id}_audio{ext}"
-        path.write_bytes(base64.b64decode(audio_dict["data"]))
+        writes.append(_write_file(temp_dir / f"{task_id}_audio{ext}", _upload_bytes(audio_dict)))
+    if writes:
+        await asyncio.gather(*writes)
 
 
 async def process_single_task(
@@ -99,76 +273,126 @@ async def process_single_task(
     wait_for_completion: bool = False,
     poll_interval: int = 5,
     timeout: int = 3600
+) -> Dict[str, Any]:
+    """处理单个任务，受 S2V_MAX_INFLIGHT 信号量限流，超出的提交在本地排队。"""
+    async with _INFLIGHT:
+        return await _process_single_task(
+            task_req, image_file, audio_file, task_id,
+            wait_for_completion=wait_for_completion,
+            poll_interval=poll_interval,
+            timeout=timeout,
+        )
+
+
+async def _process_single_task(
+    task_req: TaskRequest,
+    image_file: Optional[UploadFile],
+    audio_file: Optional[UploadFile],
+    task_id: str,
+    wait_for_completion: bool = False,
+    poll_interval: int = 5,
+    timeout: int = 3600
 ) -> Dict[str, Any]:
     """处理单个任务。先读上传到内存并立即提交，保存文件在后台异步进行，不阻塞提交与轮询。"""
-    client = S2VClient(base_url=BASE_URL, access_token=ACCESS_TOKEN)
+    client = get_client()
 
     try:
-        # 只读入内存并转 base64，不写盘，避免阻塞；image/audio 并行读
-        tasks = []
-        if image_file:
-            tasks.append(read_upload_to_base64_dict(image_file))
-        if audio_file:
-            tasks.append(read_upload_to_base64_dict(audio_file))
-        if len(tasks) == 2:
-            image_dict, audio_dict = await asyncio.gather(*tasks)
-        elif len(tasks) == 1:
-            (image_dict, audio_dict) = (await tasks[0], None) if image_file else (None, await tasks[0])
+        if MULTIPART_SUBMIT:
+            # multipart 直接转发原始字节，无需 base64
+            _check_upload_size(image_file)
+            _check_upload_size(audio_file)
+            image_bytes = await image_file.read() if image_file else None
+            audio_bytes = await audio_file.read() if audio_file else None
+            image_dict = {"type": "bytes", "data": image_bytes} if image_bytes else None
+            audio_dict = {"type": "bytes", "data": audio_bytes} if audio_bytes else None
         else:
-            image_dict, audio_dict = None, None
+            # 只读入内存并转 base64，不写盘；恒定两路并行，缺失的一路直接返回 None
+            image_dict, audio_dict = await asyncio.gather(
+                read_upload_to_base64_dict(image_file),
+                read_upload_to_base64_dict(audio_file),
+            )
         image_filename = image_file.filename if image_file else None
         audio_filename = audio_file.filename if audio_file else None
 
         # 保存文件放到后台，不等待，不阻塞提交与轮询
         if image_dict or audio_dict:
-            loop = asyncio.get_event_loop()
-            loop.run_in_executor(
-                None,
-                _save_uploads_background_sync,
-                task_id,
-                image_dict,
-                audio_dict,
-                image_filename,
-                audio_filename,
-            )
+            _spawn(_save_uploads(task_id, image_dict, audio_dict, image_filename, audio_filename))
 
         # 更新任务状态并立即提交（不依赖磁盘写入）
-        tasks_db[task_id]["status"] = "SUBMITTING"
-        tasks_db[task_id]["updated_at"] = datetime.now().isoformat()
-
-        submit_result = await client.submit_task(
-            task="s2v",
-            model_cls=task_req.model_cls,
-            stage=task_req.stage,
-            prompt=task_req.prompt,
-            negative_prompt=task_req.negative_prompt,
-            cfg_scale=task_req.cfg_scale,
-            duration=task_req.duration,
-            seed=task_req.seed,
-            input_image=image_dict,
-            input_audio=audio_dict,
+        tasks_db[task_id].update({"status": "SUBMITTING", "updated_at": _now()})
+
+        completion_event = None
+        if WEBHOOK_BASE_URL and wait_for_completion:
+            # 提交前注册事件，避免回调先于等待到达
+            completion_event = asyncio.Event()
+            _completion_events[task_id] = completion_event
+        callback_kwargs = (
+            {"callback_url": f"{WEBHOOK_BASE_URL}/api/webhook/{task_id}"} if WEBHOOK_BASE_URL else {}
         )
 
+        if MULTIPART_SUBMIT and (image_dict or audio_dict):
+            submit_result = await client.submit_task_multipart(
+                task="s2v",
+                model_cls=task_req.model_cls,
+                stage=task_req.stage,
+                prompt=task_req.prompt,
+                negative_prompt=task_req.negative_prompt,
+                cfg_scale=task_req.cfg_scale,
+                duration=task_req.duration,
+                seed=task_req.seed,
+                input_image_path=(image_filename, image_dict["data"]) if image_dict else None,
+                input_audio_path=(audio_filename, audio_dict["data"]) if audio_dict else None,
+                **callback_kwargs,
+            )
+        else:
+            submit_result = await client.submit_task(
+                task="s2v",
+                model_cls=task_req.model_cls,
+                stage=task_req.stage,
+                prompt=task_req.prompt,
+                negative_prompt=task_req.negative_prompt,
+                cfg_scale=task_req.cfg_scale,
+                duration=task_req.duration,
+                seed=task_req.seed,
+                input_image=image_dict,
+                input_audio=audio_dict,
+                **callback_kwargs,
+            )
+
         if not submit_result.get("success"):
-            tasks_db[task_id]["status"] = "FAILED"
-            tasks_db[task_id]["error"] = submit_result.get("error", "Unknown error")
-            tasks_db[task_id]["updated_at"] = datetime.now().isoformat()
+            _completion_events.pop(task_id, None)
+            tasks_db[task_id].update({
+                "status": "FAILED",
+                "error": submit_result.get("error", "Unknown error"),
+                "updated_at": _now(),
+            })
             return tasks_db[task_id]
 
         api_task_id = submit_result["task_id"]
-        tasks_db[task_id]["api_task_id"] = api_task_id
-        tasks_db[task_id]["status"] = "PENDING"
-        tasks_db[task_id]["updated_at"] = datetime.now().isoformat()
+        tasks_db[task_id].update({
+            "api_task_id": api_task_id,
+            "status": "PENDING",
+            "updated_at": _now(),
+        })
 
         if wait_for_completion:
-            tasks_db[task_id]["status"] = "PROCESSING"
-            tasks_db[task_id]["updated_at"] = datetime.now().isoformat()
-
-            final_result = await client.wait_for_task(
-                api_task_id,
-                poll_interval=poll_interval,
-                timeout=timeout
-            )
+            tasks_db[task_id].update({"status": "PROCESSING", "updated_at": _now()})
+
+            if completion_event is not None:
+                # webhook 推送：一次回调代替整场轮询，超时则落回单次查询
+                try:
+                    await asyncio.wait_for(completion_event.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    _completion_events.pop(task_id, None)
+                final_result = await client.query_task(api_task_id)
+            else:
+                final_result = await client.wait_for_task(
+                    api_task_id,
+                    poll_interval=poll_interval,
+                    timeout=timeout
+                )
 
             if final_result.get("success"):
                 status = final_result.get("status", "UNKNOWN")
@@ -182,17 +406,14 @@ async def process_single_task(
                 tasks_db[task_id]["status"] = "FAILED"
                 tasks_db[task_id]["error"] = final_result.get("error", "Unknown error")
 
-            tasks_db[task_id]["updated_at"] = datetime.now().isoformat()
+            tasks_db[task_id]["updated_at"] = _now()
 
         return tasks_db[task_id]
 
     except Exception as e:
-        tasks_db[task_id]["status"] = "FAILED"
-        tasks_db[task_id]["error"] = str(e)
-        tasks_db[task_id]["updated_at"] = datetime.now().isoformat()
+        _completion_events.pop(task_id, None)
+        tasks_db[task_id].update({"status": "FAILED", "error": str(e), "updated_at": _now()})
         return tasks_db[task_id]
-    finally:
-        client.close()
 
 
 @app.post("/api/submit")
@@ -209,17 +430,22 @@ async def submit_task(
     wait_for_completion: bool = Form(False),
 ):
     """提交单个任务"""
-    task_id = str(uuid.uuid4())
+    # 在入队前校验体积，让调用方直接收到 413 而不是事后的 FAILED 任务
+    _check_upload_size(image)
+    _check_upload_size(audio)
+
+    task_id = secrets.token_hex(16)
     
     tasks_db[task_id] = {
         "task_id": task_id,
         "status": "CREATED",
         "prompt": prompt,
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat(),
+        "created_at": (ts := _now()),
+        "updated_at": ts,
     }
     
-    task_req = TaskRequest(
+    # 各字段已由 FastAPI 的 Form 校验过，跳过 pydantic 的二次验证
+    task_req = TaskRequest.model_construct(
         prompt=prompt,
         negative_prompt=negative_prompt,
         cfg_scale=cfg_scale,
@@ -230,7 +456,7 @@ async def submit_task(
     )
     
     # 异步处理任务
-    asyncio.create_task(
+    _spawn(
         process_single_task(
             task_req,
             image,
@@ -254,20 +480,20 @@ async def batch_submit(
     task_ids = []
     
     for task_req in tasks:
-        task_id = str(uuid.uuid4())
+        task_id = secrets.token_hex(16)
         task_ids.append(task_id)
         
         tasks_db[task_id] = {
             "task_id": task_id,
             "status": "CREATED",
             "prompt": task_req.prompt,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            "created_at": (ts := _now()),
+            "updated_at": ts,
         }
         
         # 注意：批量接口无法直接处理文件上传
         # 建议使用单个提交接口循环调用
-        asyncio.create_task(
+        _spawn(
             process_single_task(
                 task_req,
                 None,  # 批量接口不支持文件上传
@@ -282,9 +508,51 @@ async def batch_submit(
     return {"task_ids": task_ids, "count": len(task_ids)}
 
 
+@app.post("/api/webhook/{task_id}")
+async def task_webhook(task_id: str, payload: Dict[str, Any]):
+    """接收 S2V 侧的状态回调，更新本地任务并唤醒等待中的协程"""
+    if task_id not in tasks_db:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    task = tasks_db[task_id]
+    status = payload.get("status")
+    if status:
+        task.update({"status": status, "api_status": status, "updated_at": _now()})
+    if payload.get("result_url"):
+        task["result_url"] = payload["result_url"]
+
+    # 推送即权威状态，作废本地的新鲜度窗口
+    api_task_id = task.get("api_task_id")
+    if api_task_id:
+        _status_fresh.pop(api_task_id, None)
+
+    event = _completion_events.get(task_id)
+    if event is not None and (not status or status in ("SUCCEED", "FAILED", "CANCELLED")):
+        event.set()
+
+    return {"success": True, "task_id": task_id}
+
+
+async def _refresh_task_status(task: Dict[str, Any], api_task_id: str) -> None:
+    """拉取上游最新状态并更新本地任务记录"""
+    client = get_client()
+    result = await client.query_task(api_task_id)
+    if result.get("success"):
+        status = result.get("status", "UNKNOWN")
+        task["api_status"] = status
+        if status in ["SUCCEED", "FAILED", "CANCELLED"]:
+            task["status"] = status
+            if status == "SUCCEED":
+                task["result_url"] = await client.get_result_url(api_task_id, name="output_video")
+            _status_fresh.pop(api_task_id, None)
+        else:
+            _status_fresh[api_task_id] = time.monotonic()
+        task["updated_at"] = _now()
+
+
 @app.get("/api/task/{task_id}")
-async def get_task(task_id: str):
-    """查询任务状态"""
+async def get_task(task_id: str, request: Request, response: Response):
+    """查询任务状态。updated_at 未变时返回 304，轮询方免去响应体和序列化。"""
     if task_id not in tasks_db:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -293,33 +561,31 @@ async def get_task(task_id: str):
     # 如果任务还在处理中，尝试查询最新状态
     if task["status"] in ["PENDING", "PROCESSING"]:
         api_task_id = task.get("api_task_id")
-        if api_task_id:
-            client = S2VClient(base_url=BASE_URL, access_token=ACCESS_TOKEN)
-            try:
-                result = await client.query_task(api_task_id)
-                if result.get("success"):
-                    status = result.get("status", "UNKNOWN")
-                    task["api_status"] = status
-                    if status in ["SUCCEED", "FAILED", "CANCELLED"]:
-                        task["status"] = status
-                        if status == "SUCCEED":
-                            result_url = await client.get_result_url(api_task_id, name="output_video")
-                            task["result_url"] = result_url
-                    task["updated_at"] = datetime.now().isoformat()
-            finally:
-                client.close()
-    
+        if api_task_id and time.monotonic() - _status_fresh.get(api_task_id, 0.0) >= _STATUS_TTL:
+            fut = _status_inflight.get(api_task_id)
+            if fut is None:
+                fut = asyncio.ensure_future(_refresh_task_status(task, api_task_id))
+                _status_inflight[api_task_id] = fut
+                try:
+                    await fut
+                finally:
+                    _status_inflight.pop(api_task_id, None)
+            else:
+                await fut
+
+    etag = hashlib.md5(task["updated_at"].encode()).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+    response.headers["ETag"] = etag
     return task
 
 
 @app.get("/api/tasks")
 async def list_tasks(limit: int = 50, offset: int = 0):
     """列出所有任务"""
-    tasks = list(tasks_db.values())
-    tasks.sort(key=lambda x: x["created_at"], reverse=True)
     return {
-        "tasks": tasks[offset:offset + limit],
-        "total": len(tasks),
+        "tasks": tasks_db.list_page(offset, limit),
+        "total": len(tasks_db),
         "limit": limit,
         "offset": offset,
     }
@@ -335,19 +601,26 @@ async def cancel_task(task_id: str):
     api_task_id = task.get("api_task_id")
     
     if api_task_id:
-        client = S2VClient(base_url=BASE_URL, access_token=ACCESS_TOKEN)
-        try:
-            success = await client.cancel_task(api_task_id)
-            if success:
-                task["status"] = "CANCELLED"
-                task["updated_at"] = datetime.now().isoformat()
-        finally:
-            client.close()
+        client = get_client()
+        success = await client.cancel_task(api_task_id)
+        if success:
+            task["status"] = "CANCELLED"
+            task["updated_at"] = _now()
+            _status_fresh.pop(api_task_id, None)
     
     return {"success": True, "task_id": task_id}
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop + httptools 显著降低事件循环与 HTTP 解析开销；
+    # 任务存储在进程内，调大 S2V_WORKERS 前需先换成共享存储
+    uvicorn.run(
+        "web_backend:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("S2V_WORKERS", "1")),
+        loop="uvloop",
+        http="httptools",
+    )
 